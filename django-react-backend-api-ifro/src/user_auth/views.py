@@ -4,10 +4,11 @@ from django.contrib.auth import authenticate
 from ninja_jwt.tokens import RefreshToken
 from ninja.errors import HttpError
 from django.utils.translation import gettext as _
+from django.utils import timezone
 from user_auth.schemas import RegisterSchema, LoginSchema, UserResponseSchema, UserUpdateSchema, PasswordChangeSchema
 from user_auth.models import User, AdminCode
 from ninja_jwt.authentication import JWTAuth
-import os
+import secrets
 from python_encrypter import EncryptionManager
 from django.shortcuts import get_object_or_404
 from django.utils.translation import gettext_lazy as _
@@ -37,7 +38,7 @@ def register(request, data: RegisterSchema):
                 raise HttpError(400, _("Invalid or expired admin code."))
         except AdminCode.DoesNotExist:
             raise HttpError(400, _("Invalid admin code."))
-    salt = os.urandom(16).hex()
+    salt = secrets.token_hex(16)
     hashed_password = EncryptionManager.hash_string(data.password, salt=salt)
     user = User.objects.create(
         username=data.username,
@@ -68,16 +69,15 @@ def login(request, data: LoginSchema):
     if hashed_input != user.password:
         raise HttpError(401, _("Invalid username or password."))
     refresh = RefreshToken.for_user(user)
-    # 커스텀 claim 추가
-    refresh['username'] = user.username
-    refresh['name'] = user.name
-    refresh['email'] = user.email
-    refresh['role'] = user.role
+    # 커스텀 claim 추가 (access_token은 refresh의 claim을 복사해서 생성됨)
+    claims = {
+        'username': user.username,
+        'name': user.name,
+        'email': user.email,
+        'role': user.role,
+    }
+    refresh.payload.update(claims)
     access = refresh.access_token
-    access['username'] = user.username
-    access['name'] = user.name
-    access['email'] = user.email
-    access['role'] = user.role
     return {
         "refresh": str(refresh),
         "access": str(access),
@@ -93,9 +93,10 @@ def login(request, data: LoginSchema):
 @router.patch("/user/me", auth=JWTAuth(), response=UserResponseSchema)
 def update_me(request, data: UserUpdateSchema):
     user = request.auth
+    # save() 대신 변경된 컬럼만 UPDATE (auto_now는 update()에서 적용되지 않으므로 직접 지정)
+    User.objects.filter(pk=user.pk).update(name=data.name, email=data.email, updated_at=timezone.now())
     user.name = data.name
     user.email = data.email
-    user.save()
     return {
         "id": user.id,
         "username": user.username,
@@ -111,11 +112,9 @@ def change_password(request, data: PasswordChangeSchema):
     hashed_current = EncryptionManager.hash_string(data.current_password, salt=user.password_salt)
     if hashed_current != user.password:
         raise HttpError(400, _("Current password is incorrect."))
-    new_salt = os.urandom(16).hex()
+    new_salt = secrets.token_hex(16)
     new_hashed = EncryptionManager.hash_string(data.new_password, salt=new_salt)
-    user.password = new_hashed
-    user.password_salt = new_salt
-    user.save()
+    User.objects.filter(pk=user.pk).update(password=new_hashed, password_salt=new_salt, updated_at=timezone.now())
     return {"msg": _("Password changed successfully.")}
 
 @router.delete("/user/me", auth=JWTAuth())
@@ -5,26 +5,34 @@ FastAPI 엔드포인트 (최적화 버전)
 """
 
 import os
+import json
+import time
 import uuid
+import asyncio
 import tempfile
-from typing import List, Dict, Optional, Any
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime
 import logging
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, Depends
+from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse, Response
 from pydantic import BaseModel, Field
 import uvicorn
+import aiofiles
+import psutil
 
 # 핵심 모듈들 임포트
 from core.pdf_processor import PDFProcessor, TextChunk
 from core.vector_store import HybridVectorStore, VectorStoreInterface
 from core.question_analyzer import QuestionAnalyzer, AnalyzedQuestion, ConversationItem
-from core.answer_generator import AnswerGenerator, Answer, ModelType, GenerationConfig
+from core.answer_generator import AnswerGenerator, Answer, ModelType, GenerationConfig, make_context_key
 from core.sql_generator import SQLGenerator, DatabaseSchema, SQLQuery
-from core.fast_cache import get_all_cache_stats, clear_all_caches
-from core.query_router import QueryRouter, QueryRoute
+from core.fast_cache import get_all_cache_stats, clear_all_caches, get_response_cache
+from core.query_router import QueryRouter, QueryRoute, RouteResult
+from core import sim_kernel
 from utils.chatbot_logger import chatbot_logger, QuestionType
 
 logger = logging.getLogger(__name__)
@@ -65,11 +73,61 @@ class SystemStatusResponse(BaseModel):
     total_chunks: int = Field(..., description="총 청크 수")
     memory_usage: Dict[str, Any] = Field(..., description="메모리 사용량")
 
+# 인사말 고정 응답 (요청마다 모델을 새로 검증하지 않도록 미리 생성)
+GREETING_RESPONSE = QuestionResponse(
+    answer="안녕하세요! IFRO 교통 시스템에 대해 궁금한 것이 있으시면 언제든 물어보세요.",
+    confidence_score=1.0,
+    used_chunks=[],
+    generation_time=0.001,
+    question_type="greeting",
+    llm_model_name="greeting_template",
+    pipeline_type="greeting",
+    sql_query=None
+)
+
+# 관련 문서를 찾지 못했을 때의 기본 답변 (읽기 전용으로 공유)
+NO_CHUNKS_ANSWER = Answer(
+    content="죄송합니다. 문서에서 해당 내용을 찾을 수 없습니다. 다른 키워드로 질문해보시거나, 더 구체적으로 질문해주세요.",
+    confidence_score=0.1,
+    used_chunks=[],
+    generation_time=0.001,
+    model_name="fallback"
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """서버 시작 시 컴포넌트/백그라운드 워커를 한 번에 초기화하고 종료 시 정리"""
+    await configure_blocking_executor()
+    await init_app_state()
+    log_worker_task = asyncio.create_task(_log_worker())
+    ask_batch_task = asyncio.create_task(_ask_batch_worker())
+    route_batch_task = asyncio.create_task(_route_batch_worker())
+    cache_write_task = asyncio.create_task(_cache_write_worker())
+    
+    yield
+    
+    tasks = (ask_batch_task, route_batch_task, log_worker_task, cache_write_task)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+# 라우터(임베딩) 없이 바로 인사말로 처리할 문구 (소문자, 끝 문장부호 제거 후 비교)
+GREETING_PHRASES = frozenset({
+    "안녕", "안녕하세요", "안녕하십니까", "반갑습니다", "반가워요",
+    "하이", "hi", "hello", "hey"
+})
+
+def _is_greeting_phrase(question: str) -> bool:
+    """정규화한 질문이 고정 인사말 문구인지 확인 (O(1))"""
+    return question.strip().rstrip("!?.~ ").lower() in GREETING_PHRASES
+
 # FastAPI 앱 초기화
 app = FastAPI(
     title="IFRO 챗봇 API",
     description="IFRO 교통 시스템 챗봇 API (최적화 버전)",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS 설정
@@ -89,51 +147,298 @@ answer_generator: Optional[AnswerGenerator] = None
 sql_generator: Optional[SQLGenerator] = None
 query_router: Optional[QueryRouter] = None
 
+# SQL 라우트 기본 스키마 (요청마다 새로 만들지 않도록 모듈 로드 시 1회 생성, 수정 금지)
+TRAFFIC_SCHEMA = DatabaseSchema(
+    table_name="traffic_intersection",
+    columns=(
+        {"name": "id", "type": "INTEGER", "description": "교차로 ID"},
+        {"name": "name", "type": "TEXT", "description": "교차로 이름"},
+        {"name": "location", "type": "TEXT", "description": "위치"},
+        {"name": "traffic_volume", "type": "INTEGER", "description": "교통량"},
+        {"name": "district", "type": "TEXT", "description": "구역"}
+    )
+)
+
 # PDF 메타데이터 저장소
 pdf_metadata: Dict[str, Dict] = {}
 
-# 의존성 함수들
-def get_pdf_processor() -> PDFProcessor:
+# PDF 메타데이터 영속화 경로 (벡터 저장소 스냅샷과 항상 함께 저장/로드)
+PDF_METADATA_PATH = "./data/.pdf_metadata.json"
+VECTOR_STORE_PATH = "./vector_store"
+
+# uvicorn 워커 수 (1보다 크면 각 워커가 시작 시 저장된 스냅샷을 각자 메모리에 로드하며,
+# 워커 간 벡터 저장소는 공유되지 않으므로 실행 중 PDF 업로드는 거부)
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+
+# /ask 응답 시맨틱 캐시 (라우트별 코사인 유사도 임계값)
+response_cache = get_response_cache()
+SEMANTIC_CACHE_THRESHOLDS = {
+    QueryRoute.PDF_SEARCH: 0.92,
+    QueryRoute.SQL_QUERY: 0.97,   # SQL 폴백은 수치 조건이 달라지기 쉬우므로 엄격하게
+    QueryRoute.UNKNOWN: 0.95,
+}
+
+# 업로드 파일 스트리밍 단위 (bytes)
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# 블로킹 작업(임베딩, LLM, PDF 처리) 전용 스레드 풀
+BLOCKING_EXECUTOR_WORKERS = (os.cpu_count() or 1) * 2
+
+async def configure_blocking_executor():
+    """asyncio.to_thread가 사용할 기본 executor 설정"""
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(
+        ThreadPoolExecutor(max_workers=BLOCKING_EXECUTOR_WORKERS, thread_name_prefix="blocking")
+    )
+
+# /ask 로그 큐 (응답 반환 후 백그라운드에서 chatbot_logger에 기록)
+LOG_QUEUE_SIZE = 1000
+_log_queue: asyncio.Queue = asyncio.Queue(maxsize=LOG_QUEUE_SIZE)
+
+async def _log_worker():
+    """로그 큐를 비우며 파일 I/O는 스레드에서 처리"""
+    while True:
+        item = await _log_queue.get()
+        try:
+            await asyncio.to_thread(chatbot_logger.log_question, **item)
+        except Exception as log_error:
+            logger.warning(f"API 로깅 중 오류 발생: {log_error}")
+        finally:
+            _log_queue.task_done()
+
+def _enqueue_log(item: Dict[str, Any]) -> None:
+    """로그 항목을 큐에 추가 (가득 차면 건너뜀, 이벤트 루프 스레드에서 호출)"""
+    try:
+        _log_queue.put_nowait(item)
+    except asyncio.QueueFull:
+        logger.warning("API 로그 큐가 가득 차 로그를 건너뜁니다.")
+
+# /ask 임베딩 + 벡터 검색 마이크로 배칭 (짧은 창 안의 동시 요청을 한 번에 처리)
+ASK_BATCH_WINDOW = 0.01  # 초
+ASK_BATCH_MAX_SIZE = 48
+ASK_SEARCH_THRESHOLD = 0.05  # 매우 낮은 임계값으로 모든 관련 문서 검색
+_ask_batch_queue: asyncio.Queue = asyncio.Queue()
+
+def _embed_and_search_batch(questions: List[str], top_ks: List[int],
+                            cache_lookups: List[Optional[Tuple[str, Optional[float]]]]
+                            ) -> List[Tuple[Optional[Any], List, Optional[Tuple[bytes, Answer]]]]:
+    """
+    질문 묶음을 한 번의 임베딩 호출로 처리하고 시맨틱 캐시를 먼저 확인한 뒤,
+    캐시 미스인 질문만 한 번의 FAISS 검색으로 처리 (질문별 top_k)
+    
+    Returns:
+        질문별 (임베딩, 관련 청크, 캐시된 (응답 본문, 답변) 또는 None)
+    """
+    try:
+        embeddings = app.state.question_analyzer.embed_batch(questions)
+    except Exception as e:
+        logger.warning(f"배치 임베딩 생성 실패: {e}")
+        embeddings = None
+    if embeddings is None:
+        return [(None, [], None) for _ in questions]
+    
+    # 캐시 히트는 검색/청크 조회 생략 (cache_lookup이 None이면 캐시 확인 안 함)
+    cached = [
+        response_cache.get(embedding, lookup[0], threshold=lookup[1]) if lookup is not None else None
+        for embedding, lookup in zip(embeddings, cache_lookups)
+    ]
+    batch_chunks: List[List] = [[] for _ in questions]
+    misses = [i for i, cached_response in enumerate(cached) if cached_response is None]
+    if misses:
+        found = app.state.vector_store.search_batch(
+            embeddings[misses], top_k=[top_ks[i] for i in misses],
+            similarity_threshold=ASK_SEARCH_THRESHOLD
+        )
+        for i, chunks in zip(misses, found):
+            batch_chunks[i] = chunks
+    return list(zip(embeddings, batch_chunks, cached))
+
+async def _ask_batch_worker():
+    """첫 요청 도착 후 ASK_BATCH_WINDOW 동안 모인 요청을 한 배치로 처리"""
+    while True:
+        batch = [await _ask_batch_queue.get()]
+        await asyncio.sleep(ASK_BATCH_WINDOW)
+        while len(batch) < ASK_BATCH_MAX_SIZE and not _ask_batch_queue.empty():
+            batch.append(_ask_batch_queue.get_nowait())
+        
+        questions = [question for question, _, _, _ in batch]
+        top_ks = [max_chunks for _, max_chunks, _, _ in batch]
+        cache_lookups = [cache_lookup for _, _, cache_lookup, _ in batch]
+        try:
+            results = await asyncio.to_thread(_embed_and_search_batch, questions, top_ks, cache_lookups)
+        except Exception as e:
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            continue
+        
+        for (_, _, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+async def _submit_ask_batch(question: str, max_chunks: int,
+                            cache_lookup: Optional[Tuple[str, Optional[float]]] = None
+                            ) -> Tuple[Optional[Any], List, Optional[Tuple[bytes, Answer]]]:
+    """
+    배치 큐에 질문을 넣고 (임베딩, 관련 청크, 캐시된 응답) 결과를 대기
+    
+    Args:
+        cache_lookup: 응답 캐시 (컨텍스트, 임계값) - 주어지면 검색 전에 캐시 확인
+    """
+    future = asyncio.get_running_loop().create_future()
+    await _ask_batch_queue.put((question, max_chunks, cache_lookup, future))
+    return await future
+
+# 라우팅 마이크로 배칭 (동시 요청의 SBERT 인코딩을 한 번으로)
+ROUTE_BATCH_WINDOW = 0.005  # 초
+ROUTE_BATCH_MAX_SIZE = 32
+_route_batch_queue: asyncio.Queue = asyncio.Queue()
+
+async def _route_batch_worker():
+    """첫 요청 도착 후 ROUTE_BATCH_WINDOW 동안 모인 질문을 route_batch 한 번으로 처리"""
+    while True:
+        batch = [await _route_batch_queue.get()]
+        await asyncio.sleep(ROUTE_BATCH_WINDOW)
+        while len(batch) < ROUTE_BATCH_MAX_SIZE and not _route_batch_queue.empty():
+            batch.append(_route_batch_queue.get_nowait())
+        
+        try:
+            results = await asyncio.to_thread(
+                app.state.query_router.route_batch, [question for question, _ in batch]
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            continue
+        
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+async def _submit_route(question: str) -> RouteResult:
+    """라우팅 배치 큐에 질문을 넣고 결과를 대기"""
+    future = asyncio.get_running_loop().create_future()
+    await _route_batch_queue.put((question, future))
+    return await future
+
+# /ask 응답 캐시 쓰기 큐 (응답 반환 후 모아서 한 번에 저장)
+CACHE_WRITE_QUEUE_SIZE = 1000
+CACHE_WRITE_BATCH_SIZE = 32
+_cache_write_queue: asyncio.Queue = asyncio.Queue(maxsize=CACHE_WRITE_QUEUE_SIZE)
+
+async def _cache_write_worker():
+    """대기 중인 캐시 쓰기를 최대 CACHE_WRITE_BATCH_SIZE개씩 직렬화해 일괄 저장"""
+    while True:
+        batch = [await _cache_write_queue.get()]
+        while len(batch) < CACHE_WRITE_BATCH_SIZE and not _cache_write_queue.empty():
+            batch.append(_cache_write_queue.get_nowait())
+        
+        try:
+            # 미리 직렬화한 응답 본문과 함께 히트 시 히스토리/로그에 쓸 답변을 저장
+            entries = []
+            for embedding, response, answer, context in batch:
+                body = _json_response(response.model_copy(update={"pipeline_type": "semantic_cache"})).body
+                entries.append((embedding, (body, answer), context))
+            response_cache.put_many(entries)
+        except Exception as e:
+            logger.warning(f"응답 캐시 저장 실패: {e}")
+
+# 의존성 함수들 (lifespan에서 생성한 app.state 인스턴스 반환)
+def get_pdf_processor(request: Request) -> PDFProcessor:
     """PDF 처리기 의존성"""
-    global pdf_processor
-    if pdf_processor is None:
-        pdf_processor = PDFProcessor()
-    return pdf_processor
+    return request.app.state.pdf_processor
 
-def get_vector_store() -> VectorStoreInterface:
+def get_vector_store(request: Request) -> VectorStoreInterface:
     """벡터 저장소 의존성"""
-    global vector_store
-    if vector_store is None:
-        vector_store = HybridVectorStore()
-    return vector_store
+    return request.app.state.vector_store
 
-def get_question_analyzer() -> QuestionAnalyzer:
+def get_question_analyzer(request: Request) -> QuestionAnalyzer:
     """질문 분석기 의존성"""
-    global question_analyzer
-    if question_analyzer is None:
-        question_analyzer = QuestionAnalyzer()
-    return question_analyzer
+    return request.app.state.question_analyzer
 
-def get_answer_generator() -> AnswerGenerator:
+def get_answer_generator(request: Request) -> AnswerGenerator:
     """답변 생성기 의존성"""
-    global answer_generator
-    if answer_generator is None:
-        answer_generator = AnswerGenerator()
-    return answer_generator
+    return request.app.state.answer_generator
 
-def get_sql_generator() -> SQLGenerator:
+def get_sql_generator(request: Request) -> SQLGenerator:
     """SQL 생성기 의존성"""
-    global sql_generator
-    if sql_generator is None:
-        sql_generator = SQLGenerator()
-    return sql_generator
+    return request.app.state.sql_generator
 
-def get_query_router() -> QueryRouter:
+def get_query_router(request: Request) -> QueryRouter:
     """쿼리 라우터 의존성"""
-    global query_router
+    return request.app.state.query_router
+
+def _ensure_components():
+    """아직 생성되지 않은 컴포넌트만 생성 (initialize_system 이후라면 기존 인스턴스 재사용)"""
+    global pdf_processor, vector_store, question_analyzer, answer_generator, sql_generator, query_router
+    
+    if pdf_processor is None:
+        pdf_processor = PDFProcessor()
+    if vector_store is None:
+        vector_store = HybridVectorStore()
+    if question_analyzer is None:
+        question_analyzer = QuestionAnalyzer()
+    if answer_generator is None:
+        answer_generator = AnswerGenerator()
+    if sql_generator is None:
+        sql_generator = SQLGenerator()
     if query_router is None:
         query_router = QueryRouter()
-    return query_router
+
+async def init_app_state():
+    """컴포넌트를 한 스레드에서 미리 생성하고 app.state에 등록 (첫 요청 지연/중복 생성 방지)"""
+    await asyncio.to_thread(_ensure_components)
+    
+    # Ollama 모델 예열 (keep_alive 동안 메모리 유지)
+    await asyncio.to_thread(answer_generator.load_model)
+    
+    # 시맨틱 캐시 유사도 커널 JIT 컴파일
+    await asyncio.to_thread(sim_kernel.warmup)
+    
+    # 멀티 워커 모드에서는 각 워커가 모듈을 새로 import하므로
+    # 시작 전에 initialize_system이 저장한 스냅샷을 로드
+    if not pdf_metadata:
+        await asyncio.to_thread(_load_persisted_state)
+    
+    app.state.pdf_processor = pdf_processor
+    app.state.vector_store = vector_store
+    app.state.question_analyzer = question_analyzer
+    app.state.answer_generator = answer_generator
+    app.state.sql_generator = sql_generator
+    app.state.query_router = query_router
+
+def _load_persisted_state():
+    """저장된 PDF 메타데이터와 벡터 저장소 스냅샷 로드 (메타데이터 파일이 있을 때만)"""
+    if not os.path.exists(PDF_METADATA_PATH):
+        return
+    
+    try:
+        with open(PDF_METADATA_PATH, "r", encoding="utf-8") as f:
+            saved_metadata = json.load(f)
+        # 스냅샷이 실제로 로드된 경우에만 메타데이터를 신뢰 (아니면 전체 재처리)
+        if not vector_store.load(VECTOR_STORE_PATH):
+            logger.warning("벡터 저장소 스냅샷이 없어 저장된 PDF 메타데이터를 무시하고 전체 재처리합니다.")
+            return
+        pdf_metadata.update(saved_metadata)
+        logger.info(f"저장된 PDF 메타데이터 로드: {len(saved_metadata)}개")
+    except Exception as e:
+        logger.warning(f"저장된 PDF 메타데이터 로드 실패, 전체 재처리합니다: {e}")
+
+def _persist_state():
+    """PDF 메타데이터와 벡터 저장소 스냅샷 저장"""
+    try:
+        vector_store.save(VECTOR_STORE_PATH)
+        temp_path = PDF_METADATA_PATH + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(pdf_metadata, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, PDF_METADATA_PATH)
+    except Exception as e:
+        logger.warning(f"PDF 메타데이터 저장 실패: {e}")
+
+def _file_fingerprint(stat: os.stat_result) -> List[int]:
+    """파일 변경 여부 판단용 (크기, 수정 시각)"""
+    return [stat.st_size, int(stat.st_mtime)]
 
 def initialize_system():
     """시스템 초기화 및 자동 PDF 업로드"""
@@ -152,6 +457,9 @@ def initialize_system():
         
         logger.info("컴포넌트 초기화 완료")
         
+        # 이전 실행에서 처리한 PDF 정보 복원
+        _load_persisted_state()
+        
         # 자동 PDF 업로드
         logger.info("=" * 60)
         logger.info("data 폴더의 PDF 파일들을 벡터 저장소에 업로드합니다...")
@@ -165,26 +473,35 @@ def initialize_system():
     except Exception as e:
         logger.error(f"시스템 초기화 실패: {e}")
 
+def _iter_pdfs(root: str):
+    """os.scandir로 재귀 탐색하며 (PDF 경로, stat) 반환 - 파일당 stat 1회"""
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_pdfs(entry.path)
+            elif entry.is_file() and entry.name[-4:].lower() == ".pdf":
+                yield entry.path, entry.stat()
+
+def _find_pdf_files() -> Dict[str, os.stat_result]:
+    """data 폴더와 data/pdfs 폴더에서 PDF 파일 수집 ({경로: stat}, 중복 경로 제거)"""
+    data_folders = ["./data", "./data/pdfs"]
+    pdf_files: Dict[str, os.stat_result] = {}
+    
+    for data_folder in data_folders:
+        if not os.path.exists(data_folder):
+            logger.warning(f"{data_folder} 폴더가 존재하지 않습니다.")
+            continue
+        
+        # 재귀적으로 PDF 파일 찾기
+        for pdf_path, stat in _iter_pdfs(data_folder):
+            pdf_files.setdefault(pdf_path, stat)
+    
+    return pdf_files
+
 def auto_upload_pdfs_sync():
     """동기적으로 PDF 파일들을 자동 업로드"""
     try:
-        import os
-        
-        # data 폴더와 data/pdfs 폴더 모두 확인
-        data_folders = ["./data", "./data/pdfs"]
-        pdf_files = []
-        
-        for data_folder in data_folders:
-            if not os.path.exists(data_folder):
-                logger.warning(f"{data_folder} 폴더가 존재하지 않습니다.")
-                continue
-            
-            # 재귀적으로 PDF 파일 찾기
-            for root, dirs, files in os.walk(data_folder):
-                for file in files:
-                    if file.lower().endswith('.pdf'):
-                        pdf_path = os.path.join(root, file)
-                        pdf_files.append(pdf_path)
+        pdf_files = _find_pdf_files()
         
         if not pdf_files:
             logger.info("data 폴더에서 PDF 파일을 찾을 수 없습니다.")
@@ -196,36 +513,59 @@ def auto_upload_pdfs_sync():
         skipped_count = 0
         failed_count = 0
         
-        for pdf_path in pdf_files:
+        # 이미 처리된(또는 중복 발견된) PDF 제외 - 파일이 바뀌지 않았으면 재처리하지 않음
+        pending_files = []
+        pending_ids = set()
+        fingerprints = {}
+        for pdf_path, stat in pdf_files.items():
+            pdf_id = os.path.basename(pdf_path)
+            fingerprint = _file_fingerprint(stat)
+            known = pdf_metadata.get(pdf_id)
+            if pdf_id in pending_ids or (known and known.get("fingerprint") in (None, fingerprint)):
+                logger.info(f"이미 처리된 PDF 건너뛰기: {pdf_id}")
+                skipped_count += 1
+                continue
+            if known:
+                # 벡터 저장소에서 기존 청크를 지울 수 없으므로 재처리하면 중복/오래된 청크가 남음
+                logger.warning(f"변경된 PDF 건너뛰기 (기존 청크 삭제 미지원, 벡터 저장소 초기화 후 재업로드 필요): {pdf_id}")
+                skipped_count += 1
+                continue
+            pending_ids.add(pdf_id)
+            pending_files.append(pdf_path)
+            fingerprints[pdf_path] = fingerprint
+        
+        # PDF 병렬 추출 + 일괄 임베딩
+        results, errors = pdf_processor.process_pdfs(pending_files)
+        failed_count += len(errors)
+        
+        all_chunks = [chunk for chunks, _ in results.values() for chunk in chunks]
+        if all_chunks:
             try:
-                # 이미 처리된 PDF인지 확인
-                pdf_id = os.path.basename(pdf_path)
-                if pdf_id in pdf_metadata:
-                    logger.info(f"이미 처리된 PDF 건너뛰기: {pdf_id}")
-                    skipped_count += 1
-                    continue
-                
-                logger.info(f"PDF 처리 중: {pdf_id}")
-                
-                # PDF 처리
-                chunks, metadata = pdf_processor.process_pdf(pdf_path)
-                vector_store.add_chunks(chunks)
-                
-                # 메타데이터 저장
-                pdf_metadata[pdf_id] = {
-                    "filename": pdf_id,
-                    "total_pages": len(chunks),
-                    "upload_time": datetime.now().isoformat(),
-                    "total_chunks": len(chunks),
-                    "file_size": os.path.getsize(pdf_path)
-                }
-                
-                uploaded_count += 1
-                logger.info(f"✓ PDF 처리 완료: {pdf_id} ({len(chunks)}개 청크)")
-                
+                vector_store.add_chunks(all_chunks)
             except Exception as e:
-                logger.error(f"PDF 처리 실패 {pdf_path}: {e}")
-                failed_count += 1
+                logger.error(f"벡터 저장소 추가 실패: {e}")
+                failed_count += len(results)
+                results = {}
+        
+        upload_time = datetime.now().isoformat()  # 같은 배치는 같은 업로드 시각
+        for pdf_path, (chunks, metadata) in results.items():
+            pdf_id = os.path.basename(pdf_path)
+            
+            # 메타데이터 저장
+            pdf_metadata[pdf_id] = {
+                "filename": pdf_id,
+                "total_pages": len(chunks),
+                "upload_time": upload_time,
+                "total_chunks": len(chunks),
+                "file_size": fingerprints[pdf_path][0],
+                "fingerprint": fingerprints[pdf_path]
+            }
+            
+            uploaded_count += 1
+            logger.info(f"✓ PDF 처리 완료: {pdf_id} ({len(chunks)}개 청크)")
+        
+        if uploaded_count:
+            _persist_state()
         
         logger.info(f"PDF 처리 완료: {uploaded_count}개 처리됨, {skipped_count}개 건너뜀, {failed_count}개 오류")
         
@@ -252,6 +592,15 @@ async def health_check():
     """헬스 체크"""
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+def _reject_if_multi_worker():
+    """멀티 워커 모드에서는 한 워커에 추가한 청크가 다른 워커에 보이지 않으므로 업로드 거부"""
+    if API_WORKERS > 1:
+        raise HTTPException(
+            status_code=409,
+            detail="멀티 워커 모드(API_WORKERS > 1)에서는 실행 중 PDF 업로드를 지원하지 않습니다. "
+                   "data 폴더에 PDF를 추가한 뒤 서버를 재시작하세요."
+        )
+
 @app.post("/upload-pdf", response_model=PDFUploadResponse)
 async def upload_pdf(
     file: UploadFile = File(...),
@@ -259,38 +608,40 @@ async def upload_pdf(
     vector_store: VectorStoreInterface = Depends(get_vector_store)
 ):
     """PDF 업로드 및 처리"""
+    _reject_if_multi_worker()
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="PDF 파일만 업로드 가능합니다.")
     
+    fd, temp_file_path = tempfile.mkstemp(suffix='.pdf')
+    os.close(fd)
     try:
-        # 임시 파일로 저장
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        # 임시 파일로 저장 (1MB 단위 비동기 스트리밍으로 메모리 사용량 제한)
+        file_size = 0
+        async with aiofiles.open(temp_file_path, 'wb') as temp_file:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await temp_file.write(chunk)
+                file_size += len(chunk)
         
         # PDF 처리
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         pdf_id = str(uuid.uuid4())
         
-        # PDF 처리 및 청크 생성
-        chunks = pdf_processor.process_pdf(temp_file_path, pdf_id)
+        # PDF 처리 및 청크 생성 (이벤트 루프 블로킹 방지)
+        chunks, _ = await asyncio.to_thread(pdf_processor.process_pdf, temp_file_path)
         
         # 벡터 저장소에 저장
-        vector_store.add_chunks(chunks)
+        await asyncio.to_thread(vector_store.add_chunks, chunks)
         
-        processing_time = (datetime.now() - start_time).total_seconds()
+        processing_time = time.perf_counter() - start_time
         
         # 메타데이터 저장
         pdf_metadata[pdf_id] = {
             "filename": file.filename,
             "total_pages": len(chunks),
             "upload_time": datetime.now().isoformat(),
-            "file_size": len(content)
+            "file_size": file_size
         }
-        
-        # 임시 파일 삭제
-        os.unlink(temp_file_path)
+        await asyncio.to_thread(_persist_state)
         
         return PDFUploadResponse(
             pdf_id=pdf_id,
@@ -303,192 +654,335 @@ async def upload_pdf(
     except Exception as e:
         logger.error(f"PDF 처리 실패: {e}")
         raise HTTPException(status_code=500, detail=f"PDF 처리 중 오류 발생: {str(e)}")
+    finally:
+        # 임시 파일 삭제 (실패 시에도)
+        os.unlink(temp_file_path)
+
+def _json_response(model: BaseModel) -> ORJSONResponse:
+    """이미 검증된 응답 모델을 그대로 직렬화 (response_model 재검증 생략)"""
+    return ORJSONResponse(content=model.model_dump())
+
+# 진행 중인 LLM 생성 (키: 질문 + 상위 3개 청크 ID, 답변 캐시 키와 동일)
+_inflight_answers: Dict[Tuple[str, str], asyncio.Future] = {}
+
+async def _generate_answer_single_flight(answer_generator: AnswerGenerator,
+                                         analyzed_question: AnalyzedQuestion,
+                                         relevant_chunks: List,
+                                         pdf_id: str) -> Answer:
+    """같은 질문/문서에 대한 동시 요청은 LLM 생성을 한 번만 수행하고 결과를 공유"""
+    key = (
+        analyzed_question.original_question,
+        make_context_key([chunk.chunk_id for chunk, _ in relevant_chunks[:3]])
+    )
+    
+    # 이벤트 루프 스레드에서만 접근하므로 별도 락 불필요
+    future = _inflight_answers.get(key)
+    if future is not None:
+        return await asyncio.shield(future)
+    
+    future = asyncio.get_running_loop().create_future()
+    # 대기자가 없어도 "exception was never retrieved" 경고가 나지 않도록 결과 소비
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    _inflight_answers[key] = future
+    try:
+        answer = await asyncio.to_thread(
+            answer_generator.generate_answer,
+            analyzed_question,
+            relevant_chunks,
+            conversation_history=None,
+            pdf_id=pdf_id
+        )
+        future.set_result(answer)
+        return answer
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        if not future.done():
+            future.cancel()
+        _inflight_answers.pop(key, None)
+
+def _pdf_log_item(request: QuestionRequest, analyzed_question: AnalyzedQuestion,
+                  answer: Answer, route: QueryRoute) -> Dict[str, Any]:
+    """PDF 검색 답변의 chatbot_logger.log_question 인자"""
+    return {
+        "user_question": request.question,
+        "question_type": QuestionType.PDF,
+        "intent": analyzed_question.intent,
+        "keywords": analyzed_question.keywords,
+        "processing_time": answer.generation_time,
+        "confidence_score": answer.confidence_score,
+        "generated_answer": answer.content,
+        "used_chunks": answer.used_chunks,
+        "model_name": answer.model_name,
+        "additional_info": {
+            "pipeline_type": route.value,
+            "user_id": request.user_id
+        }
+    }
+
+async def _sql_response(request: QuestionRequest, sql_generator: SQLGenerator) -> Optional[QuestionResponse]:
+    """규칙 기반 SQL 생성/실행 응답 (실패하면 None - 호출자가 PDF 검색으로 폴백)"""
+    try:
+        # 규칙 기반 SQL 생성
+        sql_result = await asyncio.to_thread(sql_generator.generate_sql, request.question, TRAFFIC_SCHEMA)
+        
+        if sql_result.is_valid:
+            # SQL 실행
+            execution_result = await asyncio.to_thread(sql_generator.execute_sql, sql_result)
+            
+            if execution_result['success']:
+                # 데이터를 자연어로 변환
+                data_summary = f"조회된 데이터: {execution_result.get('row_count', 0)}건"
+                if execution_result.get('data'):
+                    data_summary = f"총 {len(execution_result['data'])}건의 결과를 찾았습니다."
+                
+                return QuestionResponse(
+                    answer=data_summary,
+                    confidence_score=sql_result.confidence_score,
+                    used_chunks=[],
+                    generation_time=sql_result.execution_time,
+                    question_type="sql_query",
+                    llm_model_name=sql_result.model_name,
+                    pipeline_type="sql",
+                    sql_query=sql_result.query
+                )
+            logger.warning(f"SQL 실행 실패: {execution_result.get('error')}")
+        else:
+            logger.warning(f"SQL 검증 실패: {sql_result.error_message}")
+    except Exception as sql_error:
+        logger.warning(f"SQL 처리 실패, PDF 검색으로 폴백: {sql_error}")
+    return None
+
+def _record_exchange(request: QuestionRequest, analyzed_question: AnalyzedQuestion,
+                     answer: Answer, route: QueryRoute) -> None:
+    """대화 히스토리 추가 + API 로그 큐 등록 (이벤트 루프 스레드에서 호출)"""
+    app.state.question_analyzer.add_conversation_item(
+        question=request.question,
+        answer=answer.content,
+        used_chunks=answer.used_chunks,
+        confidence_score=answer.confidence_score
+    )
+    _enqueue_log(_pdf_log_item(request, analyzed_question, answer, route))
+
+def _pdf_response(analyzed_question: AnalyzedQuestion, answer: Answer, route: QueryRoute) -> QuestionResponse:
+    """PDF 검색 답변의 /ask 응답 모델"""
+    return QuestionResponse(
+        answer=answer.content,
+        confidence_score=answer.confidence_score,
+        used_chunks=answer.used_chunks,
+        generation_time=answer.generation_time,
+        question_type=analyzed_question.question_type.value,
+        llm_model_name=answer.model_name,
+        pipeline_type=route.value,
+        sql_query=None
+    )
 
 @app.post("/ask", response_model=QuestionResponse)
-async def ask_question(
-    request: QuestionRequest,
-    vector_store: VectorStoreInterface = Depends(get_vector_store),
-    question_analyzer: QuestionAnalyzer = Depends(get_question_analyzer),
-    answer_generator: AnswerGenerator = Depends(get_answer_generator),
-    sql_generator: SQLGenerator = Depends(get_sql_generator),
-    query_router: QueryRouter = Depends(get_query_router)
-):
+async def ask_question(request: QuestionRequest):
     """질문에 대한 답변 생성 (최적화)"""
+    state = app.state
+    question_analyzer = state.question_analyzer
+    answer_generator = state.answer_generator
+    sql_generator = state.sql_generator
+    
+    # 고정 인사말은 임베딩/라우팅 없이 즉시 응답
+    if _is_greeting_phrase(request.question):
+        return _json_response(GREETING_RESPONSE)
     
     try:
         # 🚀 SBERT 기반 쿼리 라우팅
-        route_result = query_router.route_query(request.question)
-        logger.info(f"📍 라우팅 결과: {route_result.route.value} (신뢰도: {route_result.confidence:.3f})")
+        route_result = await _submit_route(request.question)
+        logger.debug("📍 라우팅 결과: %s (신뢰도: %.3f)", route_result.route.value, route_result.confidence)
         
         # 인사말 처리 (가장 빠른 응답)
         if route_result.route == QueryRoute.GREETING:
-            return QuestionResponse(
-                answer="안녕하세요! IFRO 교통 시스템에 대해 궁금한 것이 있으시면 언제든 물어보세요.",
-                confidence_score=route_result.confidence,
-                used_chunks=[],
-                generation_time=0.001,
-                question_type="greeting",
-                llm_model_name="greeting_template",
-                pipeline_type="greeting",
-                sql_query=None
-            )
+            return _json_response(GREETING_RESPONSE)
         
-        # SQL 쿼리 처리 (규칙 기반 빠른 처리)
+        # SQL 쿼리 처리 (규칙 기반 빠른 처리, 실패 시 PDF 검색으로 폴백)
         if route_result.route == QueryRoute.SQL_QUERY:
-            try:
-                # 기본 스키마 정의
-                schema = DatabaseSchema(
-                    table_name="traffic_intersection",
-                    columns=[
-                        {"name": "id", "type": "INTEGER", "description": "교차로 ID"},
-                        {"name": "name", "type": "TEXT", "description": "교차로 이름"},
-                        {"name": "location", "type": "TEXT", "description": "위치"},
-                        {"name": "traffic_volume", "type": "INTEGER", "description": "교통량"},
-                        {"name": "district", "type": "TEXT", "description": "구역"}
-                    ]
-                )
-                
-                # 규칙 기반 SQL 생성
-                sql_result = sql_generator.generate_sql(request.question, schema)
-                
-                if sql_result.is_valid:
-                    # SQL 실행
-                    execution_result = sql_generator.execute_sql(sql_result)
-                    
-                    if execution_result['success']:
-                        # 데이터를 자연어로 변환
-                        data_summary = f"조회된 데이터: {execution_result.get('row_count', 0)}건"
-                        if execution_result.get('data'):
-                            data_summary = f"총 {len(execution_result['data'])}건의 결과를 찾았습니다."
-                        
-                        return QuestionResponse(
-                            answer=data_summary,
-                            confidence_score=sql_result.confidence_score,
-                            used_chunks=[],
-                            generation_time=sql_result.execution_time,
-                            question_type="sql_query",
-                            llm_model_name=sql_result.model_name,
-                            pipeline_type="sql",
-                            sql_query=sql_result.query
-                        )
-                    else:
-                        logger.warning(f"SQL 실행 실패: {execution_result.get('error')}")
-                        # PDF 검색으로 폴백
-                        pass
-                else:
-                    logger.warning(f"SQL 검증 실패: {sql_result.error_message}")
-                    # PDF 검색으로 폴백
-                    pass
-            except Exception as sql_error:
-                logger.warning(f"SQL 처리 실패, PDF 검색으로 폴백: {sql_error}")
-                # PDF 검색으로 폴백
-                pass
+            sql_response = await _sql_response(request, sql_generator)
+            if sql_response is not None:
+                return _json_response(sql_response)
         
         # PDF 검색 처리 (기본 모드)
-        logger.info("📄 PDF 검색 모드로 처리")
+        logger.debug("📄 PDF 검색 모드로 처리")
         
-        # 1. 질문 분석
-        analyzed_question = question_analyzer.analyze_question(
-            request.question,
-            use_conversation_context=request.use_conversation_context
+        # 1. 임베딩 -> 시맨틱 캐시 확인 -> (미스일 때만) 관련 문서 검색 (동시 요청과 묶어 배치 처리)
+        cache_context = f"{request.pdf_id}|{request.max_chunks}"
+        query_embedding, relevant_chunks, cached_response = await _submit_ask_batch(
+            request.question, request.max_chunks,
+            cache_lookup=(cache_context, SEMANTIC_CACHE_THRESHOLDS.get(route_result.route))
         )
         
-        # 2. 관련 문서 검색 (유사도 임계값 적용)
-        query_embedding = analyzed_question.embedding
-        relevant_chunks = vector_store.search(
-            query_embedding,
-            top_k=request.max_chunks,
-            similarity_threshold=0.05  # 매우 낮은 임계값으로 모든 관련 문서 검색
+        # 2. 질문 분석 (배치에서 계산한 임베딩 재사용)
+        analyzed_question = await asyncio.to_thread(
+            question_analyzer.analyze_question,
+            request.question,
+            use_conversation_context=request.use_conversation_context,
+            embedding=query_embedding
         )
         
-        # 디버깅: 검색 결과 로깅
-        logger.info(f"검색된 청크 수: {len(relevant_chunks)}")
-        for i, (chunk, score) in enumerate(relevant_chunks[:5]):
-            logger.info(f"  청크 {i+1}: {chunk.chunk_id} (유사도: {score:.3f})")
-            logger.info(f"    내용: {chunk.content[:200]}...")
+        # 의미적으로 같은 질문이면 캐시된 응답 반환
+        if cached_response is not None:
+            logger.info("🚀 시맨틱 캐시 히트")
+            cached_body, cached_answer = cached_response
+            # 캐시 히트도 대화 히스토리/API 로그에 남김 (저장해 둔 답변 사용, 본문 재파싱 없음)
+            _record_exchange(request, analyzed_question, cached_answer, route_result.route)
+            # 저장 시 미리 직렬화한 JSON 바이트를 그대로 반환 (Pydantic/orjson 재처리 없음)
+            return Response(content=cached_body, media_type="application/json")
+        
+        # 디버깅: 검색 결과 로깅 (DEBUG 레벨일 때만 포맷팅)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "검색된 청크 %d개 (상위 5개): %s",
+                len(relevant_chunks),
+                [(chunk.chunk_id, round(score, 3), chunk.content[:80]) for chunk, score in relevant_chunks[:5]]
+            )
         
         # 검색 결과가 없을 때 경고
         if not relevant_chunks:
             logger.warning("⚠️ 검색된 관련 청크가 없습니다!")
-        else:
-            logger.info(f"✅ {len(relevant_chunks)}개의 관련 청크를 찾았습니다.")
         
         # 3. 컨텍스트 검증 및 답변 생성
         if not relevant_chunks:
             logger.warning("검색된 관련 청크가 없어 기본 답변을 생성합니다.")
-            answer = Answer(
-                content="죄송합니다. 문서에서 해당 내용을 찾을 수 없습니다. 다른 키워드로 질문해보시거나, 더 구체적으로 질문해주세요.",
-                confidence_score=0.1,
-                used_chunks=[],
-                generation_time=0.001,
-                model_name="fallback"
-            )
+            answer = NO_CHUNKS_ANSWER
         else:
-            # 컨텍스트 내용 로깅
-            context_content = "\n".join([chunk.content[:100] + "..." for chunk, _ in relevant_chunks[:3]])
-            logger.info(f"📄 컨텍스트 내용 (일부):\n{context_content}")
-            
-            answer = answer_generator.generate_answer(
-                analyzed_question,
-                relevant_chunks,
-                conversation_history=None,
-                pdf_id=request.pdf_id
+            answer = await _generate_answer_single_flight(
+                answer_generator, analyzed_question, relevant_chunks, request.pdf_id
             )
         
-        # 4. 대화 히스토리에 추가
-        question_analyzer.add_conversation_item(
-            question=request.question,
-            answer=answer.content,
-            used_chunks=answer.used_chunks,
-            confidence_score=answer.confidence_score
-        )
+        # 4. 대화 히스토리 추가 + API 로깅 (백그라운드 큐에서 파일 기록)
+        _record_exchange(request, analyzed_question, answer, route_result.route)
         
-        # 5. API 로깅
-        try:
-            chatbot_logger.log_question(
-                question=request.question,
-                answer=answer.content,
-                question_type=QuestionType.PDF,
-                pipeline_type=route_result.route.value,
-                generation_time=answer.generation_time,
-                confidence_score=answer.confidence_score,
-                llm_model_name=answer.model_name,
-                user_id=request.user_id
-            )
-        except Exception as log_error:
-            logger.warning(f"API 로깅 중 오류 발생: {log_error}")
+        response = _pdf_response(analyzed_question, answer, route_result.route)
         
-        return QuestionResponse(
-            answer=answer.content,
-            confidence_score=answer.confidence_score,
-            used_chunks=answer.used_chunks,
-            generation_time=answer.generation_time,
-            question_type=analyzed_question.question_type.value,
-            llm_model_name=answer.model_name,
-            pipeline_type=route_result.route.value,
-            sql_query=None
-        )
+        # 관련 문서를 찾은 경우만 시맨틱 캐시에 저장 (직렬화/저장은 백그라운드 워커에서)
+        if relevant_chunks:
+            try:
+                _cache_write_queue.put_nowait((query_embedding, response, answer, cache_context))
+            except asyncio.QueueFull:
+                logger.warning("캐시 쓰기 큐가 가득 차 저장을 건너뜁니다.")
+        
+        return _json_response(response)
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"질문 처리 실패: {e}")
-        import traceback
-        logger.error(f"상세 오류: {traceback.format_exc()}")
+        # 스택 트레이스 포맷팅은 로그 핸들러가 출력할 때만 수행
+        logger.exception("질문 처리 실패: %s", e)
         raise HTTPException(status_code=500, detail=f"질문 처리 중 오류 발생: {str(e)}")
 
-@app.get("/status", response_model=SystemStatusResponse)
-async def get_system_status():
-    """시스템 상태 조회"""
+def _single_frame_stream(body: bytes) -> StreamingResponse:
+    """이미 만든 /ask 응답 본문을 단일 SSE 프레임으로 전송"""
+    return StreamingResponse(
+        iter([b"data: " + body + b"\n\n"]), media_type="text/event-stream"
+    )
+
+def _sse_error_frame(error: Exception) -> str:
+    """스트리밍 중 오류를 알리는 마지막 SSE 프레임"""
+    return f"event: error\ndata: {json.dumps({'error': str(error)}, ensure_ascii=False)}\n\n"
+
+@app.post("/ask/stream")
+async def ask_question_stream(request: QuestionRequest):
+    """질문에 대한 답변을 토큰 단위로 스트리밍 (text/event-stream)"""
+    state = app.state
+    question_analyzer = state.question_analyzer
+    answer_generator = state.answer_generator
+    
+    # 인사말/SQL/캐시 히트/검색 결과 없음은 LLM 스트리밍이 없으므로
+    # 이미 수행한 라우팅/검색 결과로 /ask와 같은 응답을 만들어 한 프레임으로 전송
+    if _is_greeting_phrase(request.question):
+        return _single_frame_stream(_json_response(GREETING_RESPONSE).body)
+    
     try:
-        import psutil
+        route_result = await _submit_route(request.question)
+        if route_result.route == QueryRoute.GREETING:
+            return _single_frame_stream(_json_response(GREETING_RESPONSE).body)
         
-        # 메모리 사용량
+        if route_result.route == QueryRoute.SQL_QUERY:
+            sql_response = await _sql_response(request, state.sql_generator)
+            if sql_response is not None:
+                return _single_frame_stream(_json_response(sql_response).body)
+        
+        cache_context = f"{request.pdf_id}|{request.max_chunks}"
+        query_embedding, relevant_chunks, cached_response = await _submit_ask_batch(
+            request.question, request.max_chunks,
+            cache_lookup=(cache_context, SEMANTIC_CACHE_THRESHOLDS.get(route_result.route))
+        )
+        
+        analyzed_question = await asyncio.to_thread(
+            question_analyzer.analyze_question,
+            request.question,
+            use_conversation_context=request.use_conversation_context,
+            embedding=query_embedding
+        )
+        
+        if cached_response is not None:
+            cached_body, cached_answer = cached_response
+            _record_exchange(request, analyzed_question, cached_answer, route_result.route)
+            return _single_frame_stream(cached_body)
+        
+        if not relevant_chunks:
+            _record_exchange(request, analyzed_question, NO_CHUNKS_ANSWER, route_result.route)
+            return _single_frame_stream(
+                _json_response(_pdf_response(analyzed_question, NO_CHUNKS_ANSWER, route_result.route)).body
+            )
+    except Exception as e:
+        logger.exception("스트리밍 질문 처리 실패: %s", e)
+        raise HTTPException(status_code=500, detail=f"질문 처리 중 오류 발생: {str(e)}")
+    
+    loop = asyncio.get_running_loop()
+    
+    def event_stream():
+        # StreamingResponse가 스레드 풀에서 순회하므로 블로킹 Ollama 스트림을 그대로 사용
+        try:
+            answer = yield from answer_generator.generate_answer_stream(analyzed_question, relevant_chunks)
+            question_analyzer.add_conversation_item(
+                question=request.question,
+                answer=answer.content,
+                used_chunks=answer.used_chunks,
+                confidence_score=answer.confidence_score
+            )
+            loop.call_soon_threadsafe(
+                _enqueue_log, _pdf_log_item(request, analyzed_question, answer, route_result.route)
+            )
+        except Exception as e:
+            # 연결을 그냥 끊지 않고 클라이언트가 처리할 수 있는 오류 이벤트로 종료
+            logger.exception("스트리밍 답변 실패: %s", e)
+            yield _sse_error_frame(e)
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+# /status 메모리 사용량 캐시 (대시보드 폴링 시 syscall 반복 방지)
+MEMORY_USAGE_TTL = 1.0
+_memory_usage_cache: Dict[str, Any] = {"expires_at": 0.0, "value": None}
+
+# 현재 프로세스 핸들 (요청마다 새로 만들지 않고 공유)
+_PROCESS = psutil.Process()
+
+def _get_memory_usage() -> Dict[str, Any]:
+    """psutil 메모리 통계를 MEMORY_USAGE_TTL초 동안 재사용"""
+    now = time.monotonic()
+    if now >= _memory_usage_cache["expires_at"]:
         memory = psutil.virtual_memory()
-        memory_usage = {
+        _memory_usage_cache["value"] = {
             "total": memory.total,
             "available": memory.available,
             "percent": memory.percent,
-            "used": memory.used
+            "used": memory.used,
+            "process_rss": _PROCESS.memory_info().rss
         }
+        _memory_usage_cache["expires_at"] = now + MEMORY_USAGE_TTL
+    return _memory_usage_cache["value"]
+
+@app.get("/status", response_model=SystemStatusResponse)
+async def get_system_status():
+    """시스템 상태 조회"""
+    try:
+        # 메모리 사용량
+        memory_usage = _get_memory_usage()
         
         # 모델 로드 상태
         model_loaded = (
@@ -499,12 +993,7 @@ async def get_system_status():
         
         # PDF 및 청크 수
         total_pdfs = len(pdf_metadata)
-        # 벡터 저장소에서 청크 수 확인 (get_all_chunks 메서드가 없으므로 다른 방법 사용)
-        total_chunks = 0
-        if vector_store and hasattr(vector_store, 'chunks'):
-            total_chunks = len(vector_store.chunks)
-        elif vector_store and hasattr(vector_store, 'faiss_store') and hasattr(vector_store.faiss_store, 'chunks'):
-            total_chunks = len(vector_store.faiss_store.chunks)
+        total_chunks = vector_store.count() if vector_store else 0
         
         return SystemStatusResponse(
             status="running",
@@ -593,77 +1082,67 @@ async def get_pdf_list():
         logger.error(f"PDF 목록 조회 실패: {e}")
         raise HTTPException(status_code=500, detail=f"PDF 목록 조회 실패: {str(e)}")
 
-@app.post("/auto-upload")
-async def auto_upload_pdfs():
-    """data 폴더의 PDF 파일들을 자동으로 업로드"""
+# 백그라운드 자동 업로드 진행 상태
+auto_upload_status: Dict[str, Any] = {
+    "state": "idle",  # idle / running / completed / failed
+    "files_queued": 0,
+    "started_at": None,
+    "finished_at": None,
+    "result": None
+}
+
+def _run_auto_upload():
+    """백그라운드 자동 업로드 실행 (스레드 풀에서 실행됨)"""
+    result = auto_upload_pdfs_sync()
+    auto_upload_status.update({
+        "state": "failed" if "error" in result else "completed",
+        "finished_at": datetime.now().isoformat(),
+        "result": result
+    })
+
+@app.post("/auto-upload", status_code=202)
+async def auto_upload_pdfs(background_tasks: BackgroundTasks):
+    """data 폴더의 PDF 파일들을 백그라운드에서 자동으로 업로드"""
+    _reject_if_multi_worker()
     try:
-        import os
-        from pathlib import Path
-        
-        # data 폴더와 data/pdfs 폴더 모두 확인
-        data_folders = ["./data", "./data/pdfs"]
-        pdf_files = []
-        
-        for data_folder in data_folders:
-            if not os.path.exists(data_folder):
-                logger.warning(f"{data_folder} 폴더가 존재하지 않습니다.")
-                continue
-            
-            # 재귀적으로 PDF 파일 찾기
-            for root, dirs, files in os.walk(data_folder):
-                for file in files:
-                    if file.lower().endswith('.pdf'):
-                        pdf_path = os.path.join(root, file)
-                        pdf_files.append(pdf_path)
+        if auto_upload_status["state"] == "running":
+            return {"status": "running", "files_queued": auto_upload_status["files_queued"]}
         
+        # 파일 탐색(await) 중 다른 요청이 끼어들어 중복 실행하지 않도록 await 전에 running으로 표시
+        previous_status = dict(auto_upload_status)
+        auto_upload_status.update({
+            "state": "running",
+            "files_queued": 0,
+            "started_at": datetime.now().isoformat(),
+            "finished_at": None,
+            "result": None
+        })
+        try:
+            pdf_files = await asyncio.to_thread(_find_pdf_files)
+        except Exception:
+            auto_upload_status.update(previous_status)
+            raise
         if not pdf_files:
+            auto_upload_status.update(previous_status)
             return {"message": "업로드할 PDF 파일이 없습니다.", "uploaded_count": 0}
         
         logger.info(f"자동 업로드 시작: {len(pdf_files)}개의 PDF 파일")
         
-        uploaded_count = 0
-        failed_count = 0
+        auto_upload_status["files_queued"] = len(pdf_files)
+        background_tasks.add_task(_run_auto_upload)
         
-        for pdf_path in pdf_files:
-            try:
-                # 이미 처리된 PDF인지 확인
-                pdf_id = os.path.basename(pdf_path)
-                if pdf_id in pdf_metadata:
-                    logger.info(f"이미 처리된 PDF 건너뛰기: {pdf_id}")
-                    continue
-                
-                # PDF 처리
-                chunks, metadata = pdf_processor.process_pdf(pdf_path)
-                vector_store.add_chunks(chunks)
-                
-                # 메타데이터 저장
-                pdf_metadata[pdf_id] = {
-                    "filename": pdf_id,
-                    "total_pages": len(chunks),
-                    "upload_time": datetime.now().isoformat(),
-                    "total_chunks": len(chunks),
-                    "file_size": os.path.getsize(pdf_path)
-                }
-                
-                uploaded_count += 1
-                logger.info(f"PDF 자동 업로드 완료: {pdf_id} ({len(chunks)}개 청크)")
-                
-            except Exception as e:
-                logger.error(f"PDF 자동 업로드 실패 {pdf_path}: {e}")
-                failed_count += 1
-        
-        return {
-            "message": f"자동 업로드 완료: {uploaded_count}개 성공, {failed_count}개 실패",
-            "uploaded_count": uploaded_count,
-            "failed_count": failed_count,
-            "total_files": len(pdf_files)
-        }
+        return {"status": "accepted", "files_queued": len(pdf_files)}
         
     except Exception as e:
         logger.error(f"자동 업로드 실패: {e}")
         raise HTTPException(status_code=500, detail=f"자동 업로드 실패: {str(e)}")
 
+@app.get("/auto-upload/status")
+async def get_auto_upload_status():
+    """백그라운드 자동 업로드 진행 상태 조회"""
+    return auto_upload_status
+
 if __name__ == "__main__":
     # 서버 시작 전 시스템 초기화
     initialize_system()
-    uvicorn.run(app, host="0.0.0.0", port=8008)
+    uvicorn.run(app, host="0.0.0.0", port=8008, loop="uvloop", http="httptools")
@@ -1 +1,8 @@
 # PDF QA 모듈 핵심 컴포넌트
+import os
+
+# SBERT 인코딩 스레드 설정 (torch/tokenizers가 import되기 전에 적용되어야 함)
+# - HF fast tokenizer의 rayon 스레드가 torch 스레드 풀과 경합하지 않도록 비활성화
+# - 짧은 문장 인코딩은 4~8 스레드 이상에서 이득이 없으므로 intra-op 스레드 상한 지정
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+os.environ.setdefault("OMP_NUM_THREADS", str(min(8, os.cpu_count() or 4)))
@@ -5,11 +5,15 @@
 """
 
 import os
+import json
 import time
-from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Optional, Tuple, Iterator, Generator
+from dataclasses import dataclass, replace
 from enum import Enum
 import logging
+import numpy as np
 
 # 로컬 LLM 라이브러리
 try:
@@ -25,11 +29,71 @@ from .fast_cache import get_question_cache
 
 logger = logging.getLogger(__name__)
 
+# 모든 OllamaInterface가 공유하는 클라이언트 (HTTP 커넥션 풀/Keep-Alive 재사용)
+_OLLAMA_CLIENT = ollama.Client(host=os.getenv('OLLAMA_HOST', 'http://localhost:11434')) if OLLAMA_AVAILABLE else None
+
+# 답변 생성 모델 (양자화 태그 고정: q4_K_M은 f16 대비 가중치/KV 대역폭 절반)
+# 품질 우선이면 ANS_GEN_MODEL=qwen2:1.5b-instruct-q5_K_M (대역폭 약 25% 증가),
+# f16에 가까운 정확도가 필요하면 qwen2:1.5b-instruct-q8_0
+DEFAULT_MODEL_NAME = os.getenv("ANS_GEN_MODEL", "qwen2:1.5b-instruct-q4_K_M")
+
+# Ollama 모델 메모리 유지 시간 (고정 system 프롬프트의 prefix KV 캐시 재사용)
+# 기본값 -1: 언로드하지 않고 계속 유지. "30m" 같은 기간 문자열도 가능
+_keep_alive = os.getenv("OLLAMA_KEEP_ALIVE", "-1")
+OLLAMA_KEEP_ALIVE = int(_keep_alive) if _keep_alive.lstrip("-").isdigit() else _keep_alive
+
+# 요청마다 바뀌지 않는 지시사항 (system 메시지로 고정)
+SYSTEM_PROMPT_TEMPLATE = """다음 문서 내용을 기반으로 질문에 답변해주세요.
+
+지시사항:
+1. 문서 내용을 꼼꼼히 읽고 질문과 관련된 모든 정보를 찾아보세요.
+2. 문서에 관련 내용이 있으면 반드시 그 내용을 바탕으로 답변하세요.
+3. 답변은 구체적이고 실용적으로 작성하세요.
+4. 최대 {max_length}자 이내에 답변을 완성하세요.
+5. 단계별로 설명하거나 예시를 들어 설명하세요.
+6. 문서에 관련 정보가 정말 없을 때만 "문서에서 해당 내용을 찾을 수 없습니다."라고 답변하세요.
+7. 키워드 매칭이나 유사한 표현도 고려하여 답변하세요.
+8. 한국어로 답변하세요."""
+
+# 프롬프트에 넣을 문서 컨텍스트 최대 길이 (문자)
+MAX_CONTEXT_LENGTH = 800
+# 같은 청크 조합으로 만든 컨텍스트 문자열을 재사용할 최대 개수
+CONTEXT_CACHE_SIZE = 256
+# 질문에 할당할 토큰 여유분
+QUESTION_TOKEN_BUDGET = 256
+# num_ctx 범위 (모델 최대 컨텍스트로 제한)
+MIN_NUM_CTX = 512
+MODEL_MAX_CTX = 32768
+# 프롬프트 처리 배치 크기 (VRAM이 작은 환경에서는 256 권장)
+OLLAMA_NUM_BATCH = int(os.getenv("OLLAMA_NUM_BATCH", "512"))
+
+def _fit_num_ctx(max_prompt_tokens: int, max_length: int) -> int:
+    """최대 프롬프트 + 생성 길이를 담는 2의 거듭제곱 컨텍스트 크기"""
+    needed = max(max_prompt_tokens + max_length, 1)
+    return max(MIN_NUM_CTX, min(MODEL_MAX_CTX, 1 << (needed - 1).bit_length()))
+
+# user 메시지 고정 부분 (요청마다 format 파싱 없이 문자열 연결)
+_PROMPT_HEAD = "문서 내용:\n"
+_PROMPT_MID = "\n\n질문: "
+
+def make_context_key(chunk_ids: List[str]) -> str:
+    """답변 캐시/중복 생성 방지용 컨텍스트 키 (상위 3개 청크 ID)"""
+    return ",".join(chunk_ids[:3])
+
+def _log_timings(**timings: float) -> None:
+    """단계별 소요 시간을 한 줄로 기록 (DEBUG가 꺼져 있으면 포맷팅 비용 없음)"""
+    logger.debug("timings: %s", timings)
+
+
+def _sse_frame(payload: Dict) -> str:
+    """Server-Sent Events 프레임 생성"""
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
 class ModelType(Enum):
     """지원하는 모델 타입"""
     OLLAMA = "ollama"
 
-@dataclass
+@dataclass(slots=True)
 class GenerationConfig:
     """텍스트 생성 설정 (정확성 최적화)"""
     max_length: int = 256  # 답변 길이 제한
@@ -40,7 +104,7 @@ class GenerationConfig:
     do_sample: bool = True
     num_return_sequences: int = 1
 
-@dataclass
+@dataclass(slots=True)
 class Answer:
     """생성된 답변 데이터 클래스"""
     content: str
@@ -53,10 +117,63 @@ class Answer:
 class OllamaInterface:
     """Ollama 인터페이스 (최적화)"""
     
-    def __init__(self, model_name: str = "qwen2:1.5b", config: GenerationConfig = None):
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, config: GenerationConfig = None,
+                 system_prompt: str = ""):
         self.model_name = model_name
         self.config = config or GenerationConfig()
-        self.client = ollama.Client(host=os.getenv('OLLAMA_HOST', 'http://localhost:11434'))
+        self.set_system_prompt(system_prompt)
+        self.client = _OLLAMA_CLIENT
+    
+    def set_system_prompt(self, system_prompt: str) -> None:
+        """system 메시지 설정 (메시지 dict는 한 번만 생성해 재사용)"""
+        self.system_prompt = system_prompt
+        self._system_message = {"role": "system", "content": system_prompt}
+        
+        # chat용 num_ctx: 요청마다 바꾸면 Ollama가 모델을 다시 로드하므로 최대 프롬프트 기준으로 고정
+        # (한국어는 대략 1자 ≤ 1토큰이므로 문자 수를 토큰 수 상한으로 사용)
+        max_prompt_tokens = (len(system_prompt) + len(_PROMPT_HEAD) + MAX_CONTEXT_LENGTH
+                             + len(_PROMPT_MID) + QUESTION_TOKEN_BUDGET)
+        self.chat_num_ctx = _fit_num_ctx(max_prompt_tokens, self.config.max_length)
+    
+    def _options(self) -> Dict:
+        """
+        생성 옵션
+        
+        모든 호출(예열/generate/chat)이 같은 로드 옵션(num_ctx, num_batch, num_gpu 등)을 써야
+        Ollama가 러너를 다시 로드하지 않음
+        """
+        return {
+            'temperature': self.config.temperature,
+            'top_p': self.config.top_p,
+            'top_k': self.config.top_k,
+            'num_predict': self.config.max_length,
+            'repeat_penalty': self.config.repetition_penalty,
+            'num_thread': 8,  # 더 많은 스레드 사용
+            'num_gpu': 1,     # GPU 가속
+            'num_ctx': self.chat_num_ctx,  # 최대 프롬프트 기준으로 고정한 컨텍스트 크기
+            'num_batch': OLLAMA_NUM_BATCH, # 배치 크기 최적화
+            'rope_freq_base': 10000,  # RoPE 최적화
+            'rope_freq_scale': 0.5    # RoPE 스케일링
+        }
+    
+    def warmup(self) -> bool:
+        """
+        모델을 미리 메모리에 올리고 keep_alive 동안 유지
+        
+        실제 요청과 같은 옵션/system 메시지로 1토큰만 생성해 러너 재로드 없이
+        system 프롬프트 prefix KV 캐시까지 예열
+        """
+        try:
+            self.client.chat(
+                model=self.model_name,
+                messages=[self._system_message, {"role": "user", "content": "ping"}],
+                options={**self._options(), 'num_predict': 1},
+                keep_alive=OLLAMA_KEEP_ALIVE
+            )
+            return True
+        except Exception as e:
+            logger.warning(f"Ollama 모델 예열 실패: {e}")
+            return False
         
     def generate(self, prompt: str) -> str:
         """텍스트 생성 (최적화)"""
@@ -64,65 +181,72 @@ class OllamaInterface:
             response = self.client.generate(
                 model=self.model_name,
                 prompt=prompt,
-                options={
-                    'temperature': self.config.temperature,
-                    'top_p': self.config.top_p,
-                    'top_k': self.config.top_k,
-                    'num_predict': self.config.max_length,
-                    'repeat_penalty': self.config.repetition_penalty,
-                    'num_thread': 8,  # 더 많은 스레드 사용
-                    'num_gpu': 1,     # GPU 가속
-                    'num_ctx': 1024,  # 컨텍스트 크기 제한
-                    'num_batch': 512, # 배치 크기 최적화
-                    'rope_freq_base': 10000,  # RoPE 최적화
-                    'rope_freq_scale': 0.5    # RoPE 스케일링
-                }
+                options=self._options(),
+                keep_alive=OLLAMA_KEEP_ALIVE
             )
             return response['response']
         except Exception as e:
             logger.error(f"Ollama 생성 실패: {e}")
             return "답변을 생성할 수 없습니다."
+    
+    def _messages(self, context: str, question: str) -> List[Dict]:
+        """고정 system 메시지 + 문서/질문 user 메시지"""
+        return [
+            self._system_message,
+            {"role": "user", "content": _PROMPT_HEAD + context + _PROMPT_MID + question}
+        ]
+    
+    def chat(self, context: str, question: str) -> str:
+        """고정 system 메시지 + 문서/질문 user 메시지로 생성 (prefix KV 캐시 재사용)"""
+        try:
+            response = self.client.chat(
+                model=self.model_name,
+                messages=self._messages(context, question),
+                options=self._options(),
+                keep_alive=OLLAMA_KEEP_ALIVE
+            )
+            return response['message']['content']
+        except Exception as e:
+            logger.error(f"Ollama 생성 실패: {e}")
+            return "답변을 생성할 수 없습니다."
+    
+    def chat_stream(self, context: str, question: str) -> Iterator[str]:
+        """chat과 같은 메시지로 생성하되 토큰이 나오는 대로 반환"""
+        for part in self.client.chat(
+            model=self.model_name,
+            messages=self._messages(context, question),
+            options=self._options(),
+            keep_alive=OLLAMA_KEEP_ALIVE,
+            stream=True
+        ):
+            yield part['message']['content']
 
 class AnswerGenerator:
     """답변 생성기 (최적화)"""
     
-    def __init__(self, model_name: str = "qwen2:1.5b", cache_enabled: bool = True):
+    def __init__(self, model_name: Optional[str] = None, cache_enabled: bool = True):
+        model_name = model_name or DEFAULT_MODEL_NAME
         self.model_name = model_name
         self.cache_enabled = cache_enabled
         
-        # LLM 인터페이스 초기화
+        # LLM 인터페이스 초기화 (지시사항은 system 메시지로 고정)
         self.llm = OllamaInterface(model_name)
+        self.llm.set_system_prompt(SYSTEM_PROMPT_TEMPLATE.format(max_length=self.llm.config.max_length))
         
         # 캐시 초기화
         self.cache = get_question_cache() if cache_enabled else None
         
-        # 프롬프트 템플릿 (정확성 최적화)
-        self.prompt_templates = {
-            "basic": """다음 문서 내용을 기반으로 질문에 답변해주세요.
-
-문서 내용:
-{context}
-
-질문: {question}
-
-지시사항:
-1. 위 문서 내용을 꼼꼼히 읽고 질문과 관련된 모든 정보를 찾아보세요.
-2. 문서에 관련 내용이 있으면 반드시 그 내용을 바탕으로 답변하세요.
-3. 답변은 구체적이고 실용적으로 작성하세요.
-4. 최대 {max_length}자 이내에 답변을 완성하세요.
-5. 단계별로 설명하거나 예시를 들어 설명하세요.
-6. 문서에 관련 정보가 정말 없을 때만 "문서에서 해당 내용을 찾을 수 없습니다."라고 답변하세요.
-7. 키워드 매칭이나 유사한 표현도 고려하여 답변하세요.
-
-답변:"""
-        }
+        # 청크 조합 -> 컨텍스트 문자열 (LRU, generate_answer가 스레드에서 실행되므로 락 사용)
+        self._context_cache: "OrderedDict[Tuple, str]" = OrderedDict()
+        self._context_lock = threading.Lock()
         
         logger.info(f"답변 생성기 초기화 완료: {model_name}")
     
     def load_model(self) -> bool:
-        """모델 로드 (Ollama는 이미 로드되어 있음)"""
+        """모델 로드 (Ollama 서버에 모델 예열)"""
         try:
-            # Ollama는 이미 실행 중이므로 모델 로드 성공으로 간주
+            # Ollama 서버에 모델을 미리 올려 첫 요청의 로드 지연 제거 (실패해도 첫 요청 시 로드됨)
+            self.llm.warmup()
             logger.info(f"Ollama 모델 {self.model_name} 로드 완료")
             return True
         except Exception as e:
@@ -142,57 +266,48 @@ class AnswerGenerator:
                        conversation_history: List = None,
                        pdf_id: Optional[str] = None) -> Answer:
         """질문에 대한 답변 생성 (최적화)"""
-        total_start_time = time.time()
+        total_start_time = time.perf_counter()
         question = analyzed_question.original_question
+        chunk_ids = [chunk.chunk_id for chunk, _ in relevant_chunks]
+        context_key = self._cache_context(chunk_ids)
         
         # 1. 캐시 확인 (빠른 응답)
-        cache_start = time.time()
+        cache_start = time.perf_counter()
         if self.cache_enabled and self.cache:
-            context_key = str([chunk.chunk_id for chunk, _ in relevant_chunks][:3])
             cached_answer = self.cache.get(question, context_key)
             if cached_answer:
-                cache_time = time.time() - cache_start
-                print(f"  🚀 캐시 히트: {cache_time:.3f}초")
+                cache_time = time.perf_counter() - cache_start
+                logger.debug("🚀 캐시 히트: %.3f초", cache_time)
                 return cached_answer
-        cache_time = time.time() - cache_start
+        cache_time = time.perf_counter() - cache_start
         
         # 2. 컨텍스트 구성 (단순화)
-        context_start = time.time()
+        context_start = time.perf_counter()
         context = self._build_context(relevant_chunks)
-        context_time = time.time() - context_start
-        print(f"  📝 컨텍스트 구성: {context_time:.3f}초")
+        context_time = time.perf_counter() - context_start
         
-        # 3. 프롬프트 구성
-        prompt_start = time.time()
-        prompt = self.prompt_templates["basic"].format(
-            context=context,
-            question=question,
-            max_length=self.llm.config.max_length
-        )
-        prompt_time = time.time() - prompt_start
-        print(f"  📋 프롬프트 구성: {prompt_time:.3f}초")
+        # 3. 프롬프트 구성 (지시사항은 system 메시지에 고정, 문서/질문만 전달)
+        prompt_time = 0.0
         
         # 4. 답변 생성 (가장 오래 걸리는 부분)
-        llm_start = time.time()
+        llm_start = time.perf_counter()
         try:
-            generated_text = self.llm.generate(prompt)
-            llm_time = time.time() - llm_start
-            print(f"  🤖 LLM 추론: {llm_time:.2f}초")
+            generated_text = self.llm.chat(context, question)
+            llm_time = time.perf_counter() - llm_start
             
             # 5. 기본 후처리
-            postprocess_start = time.time()
+            postprocess_start = time.perf_counter()
             processed_answer = generated_text.strip()
             if not processed_answer:
                 processed_answer = "답변을 생성할 수 없습니다."
-            postprocess_time = time.time() - postprocess_start
-            print(f"  ✂️  후처리: {postprocess_time:.3f}초")
+            postprocess_time = time.perf_counter() - postprocess_start
             
-            total_time = time.time() - total_start_time
+            total_time = time.perf_counter() - total_start_time
             
             answer = Answer(
                 content=processed_answer,
                 confidence_score=0.8,  # 고정 신뢰도
-                used_chunks=[chunk.chunk_id for chunk, _ in relevant_chunks],
+                used_chunks=chunk_ids,
                 generation_time=total_time,
                 model_name=self.llm.model_name,
                 metadata={
@@ -210,22 +325,27 @@ class AnswerGenerator:
             )
             
             # 6. 캐시에 저장
-            cache_save_start = time.time()
+            cache_save_start = time.perf_counter()
             if self.cache_enabled and self.cache:
                 self.cache.put(question, answer, context_key)
-            cache_save_time = time.time() - cache_save_start
-            print(f"  💾 캐시 저장: {cache_save_time:.3f}초")
-            
-            print(f"  📊 LLM 생성 세부: 캐시({cache_time/total_time*100:.1f}%) | 컨텍스트({context_time/total_time*100:.1f}%) | 프롬프트({prompt_time/total_time*100:.1f}%) | LLM({llm_time/total_time*100:.1f}%) | 후처리({postprocess_time/total_time*100:.1f}%)")
-            
-            logger.info(f"답변 생성 완료: {total_time:.2f}초")
+            cache_save_time = time.perf_counter() - cache_save_start
+            _log_timings(
+                cache_check=cache_time, context_build=context_time, llm_generation=llm_time,
+                postprocess=postprocess_time, cache_save=cache_save_time
+            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "답변 생성 완료: %.2f초 | 캐시(%.1f%%) | 컨텍스트(%.1f%%) | LLM(%.1f%%) | 후처리(%.1f%%)",
+                    total_time, cache_time / total_time * 100, context_time / total_time * 100,
+                    llm_time / total_time * 100, postprocess_time / total_time * 100
+                )
             return answer
             
         except Exception as e:
-            llm_time = time.time() - llm_start
-            total_time = time.time() - total_start_time
+            llm_time = time.perf_counter() - llm_start
+            total_time = time.perf_counter() - total_start_time
             logger.error(f"답변 생성 실패: {e}")
-            print(f"  ❌ LLM 오류: {llm_time:.2f}초 후 실패")
+            logger.debug("❌ LLM 오류: %.2f초 후 실패", llm_time)
             return Answer(
                 content="죄송합니다. 답변을 생성하는 중 오류가 발생했습니다.",
                 confidence_score=0.0,
@@ -235,28 +355,120 @@ class AnswerGenerator:
                 metadata={"error": str(e)}
             )
     
+    def generate_answer_stream(self,
+                               analyzed_question: AnalyzedQuestion,
+                               relevant_chunks: List[Tuple[TextChunk, float]]) -> Generator[str, None, Answer]:
+        """답변을 토큰 단위 SSE 프레임으로 스트리밍 (종료 프레임 후 최종 Answer 반환)"""
+        total_start_time = time.perf_counter()
+        question = analyzed_question.original_question
+        used_chunks = [chunk.chunk_id for chunk, _ in relevant_chunks]
+        context_key = self._cache_context(used_chunks)
+        
+        # 1. 캐시 확인 (히트 시 전체 답변을 한 프레임으로 전송)
+        if self.cache_enabled and self.cache:
+            cached_answer = self.cache.get(question, context_key)
+            if cached_answer:
+                answer = replace(cached_answer, metadata={**(cached_answer.metadata or {}), "from_cache": True})
+                yield _sse_frame({"token": answer.content})
+                yield _sse_frame(self._final_frame(answer))
+                return answer
+        
+        # 2. 컨텍스트 구성 후 토큰 스트리밍
+        context = self._build_context(relevant_chunks)
+        tokens = []
+        try:
+            for token in self.llm.chat_stream(context, question):
+                tokens.append(token)
+                yield _sse_frame({"token": token})
+        except Exception as e:
+            logger.error(f"스트리밍 답변 생성 실패: {e}")
+            answer = Answer(
+                content="죄송합니다. 답변을 생성하는 중 오류가 발생했습니다.",
+                confidence_score=0.0,
+                used_chunks=[],
+                generation_time=time.perf_counter() - total_start_time,
+                model_name=self.llm.model_name,
+                metadata={"error": str(e)}
+            )
+            yield _sse_frame(self._final_frame(answer))
+            return answer
+        
+        # 3. 스트림 종료 시 최종 답변 구성 및 캐시 저장
+        answer = Answer(
+            content="".join(tokens).strip() or "답변을 생성할 수 없습니다.",
+            confidence_score=0.8,  # 고정 신뢰도
+            used_chunks=used_chunks,
+            generation_time=time.perf_counter() - total_start_time,
+            model_name=self.llm.model_name,
+            metadata={
+                "question_type": analyzed_question.question_type.value,
+                "num_chunks_used": len(relevant_chunks),
+                "from_cache": False,
+                "streamed": True
+            }
+        )
+        if self.cache_enabled and self.cache:
+            self.cache.put(question, answer, context_key)
+        
+        yield _sse_frame(self._final_frame(answer))
+        logger.info(f"스트리밍 답변 생성 완료: {answer.generation_time:.2f}초")
+        return answer
+    
+    def _cache_context(self, chunk_ids: List[str]) -> str:
+        """답변 캐시 컨텍스트 (디스크 캐시가 재시작 후에도 남으므로 모델 이름 포함)"""
+        return f"{self.llm.model_name}|{make_context_key(chunk_ids)}"
+    
+    @staticmethod
+    def _final_frame(answer: Answer) -> Dict:
+        """스트림 종료 프레임 내용"""
+        metadata = answer.metadata or {}
+        return {
+            "done": True,
+            "answer": answer.content,
+            "confidence_score": answer.confidence_score,
+            "used_chunks": answer.used_chunks,
+            "generation_time": answer.generation_time,
+            "llm_model_name": answer.model_name,
+            "from_cache": metadata.get("from_cache", False),
+            "error": metadata.get("error")
+        }
+    
     def _build_context(self, relevant_chunks: List[Tuple[TextChunk, float]], 
-                       max_context_length: int = 800) -> str:
+                       max_context_length: int = MAX_CONTEXT_LENGTH) -> str:
         """컨텍스트 구성 (최적화)"""
         if not relevant_chunks:
             return "관련 정보를 찾을 수 없습니다."
         
-        context_parts = []
-        current_length = 0
+        # 같은 청크/유사도 조합이면 이전에 만든 문자열 재사용
+        similarities = [f"{similarity:.2f}" for _, similarity in relevant_chunks]
+        key = (max_context_length,
+               tuple(chunk.chunk_id for chunk, _ in relevant_chunks), tuple(similarities))
+        with self._context_lock:
+            context = self._context_cache.get(key)
+            if context is not None:
+                self._context_cache.move_to_end(key)
+                return context
         
-        for chunk, similarity in relevant_chunks:
-            chunk_text = chunk.content.strip()
-            if current_length + len(chunk_text) > max_context_length:
-                break
-            
-            context_parts.append(f"[유사도: {similarity:.2f}] {chunk_text}")
-            current_length += len(chunk_text)
+        # 누적 길이가 max_context_length 이하인 앞쪽 청크만 사용 (길이/strip은 청크에 캐시됨)
+        lengths = np.fromiter((chunk.char_len for chunk, _ in relevant_chunks),
+                              dtype=np.int64, count=len(relevant_chunks))
+        cutoff = int(np.searchsorted(np.cumsum(lengths), max_context_length, side="right"))
+        
+        context = "\n\n".join(
+            f"[유사도: {similarity}] {chunk.stripped_content}"
+            for (chunk, _), similarity in zip(relevant_chunks[:cutoff], similarities)
+        )
         
-        return "\n\n".join(context_parts)
+        with self._context_lock:
+            self._context_cache[key] = context
+            if len(self._context_cache) > CONTEXT_CACHE_SIZE:
+                self._context_cache.popitem(last=False)
+        return context
     
     def update_model_config(self, config: GenerationConfig):
         """모델 설정 업데이트"""
         self.llm.config = config
+        self.llm.set_system_prompt(SYSTEM_PROMPT_TEMPLATE.format(max_length=config.max_length))
         logger.info("모델 설정 업데이트 완료")
     
     def get_model_info(self) -> Dict:
@@ -4,13 +4,37 @@
 속도 최적화를 위한 간단한 인메모리 캐시 구현
 """
 
+import os
 import time
 import hashlib
 import json
-from typing import Dict, Any, Optional
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass
 import logging
 
+import numpy as np
+
+from .sim_kernel import cosine_scores, quantize_int8
+
+# 비암호화 고속 해시 (선택적, 없으면 hashlib.blake2b 사용)
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# 디스크 영속 캐시 (선택적, 없으면 메모리 캐시만 사용)
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+# 디스크 캐시 최대 용량 (바이트)
+DISK_CACHE_SIZE_LIMIT = int(1e9)
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -28,26 +52,60 @@ class FastCache:
     특징:
     - 단순한 딕셔너리 기반 캐시
     - TTL(Time To Live) 지원
-    - LRU 기반 자동 정리
+    - LRU 기반 자동 정리 (OrderedDict 순서 = 최근 사용 순, O(1) 제거)
+    - 백그라운드 스레드가 주기적으로 만료 항목 정리
     - 해시 기반 키 생성
+    - persist_dir 지정 시 diskcache에도 저장해 재시작 후에도 히트 유지
     """
     
-    def __init__(self, max_size: int = 1000, default_ttl: float = 3600):
+    def __init__(self, max_size: int = 1000, default_ttl: float = 3600,
+                 sweep_interval: Optional[float] = None, persist_dir: Optional[str] = None):
         """
         FastCache 초기화
         
         Args:
             max_size: 최대 캐시 크기
             default_ttl: 기본 TTL (초)
+            sweep_interval: 만료 항목 정리 주기 (초, None이면 default_ttl / 4)
+            persist_dir: 디스크 캐시 디렉토리 (None이거나 diskcache가 없으면 메모리만 사용)
         """
         self.max_size = max_size
         self.default_ttl = default_ttl
-        self.cache: Dict[str, CacheItem] = {}
+        self.cache: "OrderedDict[str, CacheItem]" = OrderedDict()
         self.hits = 0
         self.misses = 0
+        self._lock = threading.Lock()
+        
+        # 디스크 캐시 (메모리 미스 시 조회, 저장 시 함께 기록)
+        # import 시 디렉토리를 만들지 않도록 첫 사용 시점에 생성
+        self._persist_dir = persist_dir if DISKCACHE_AVAILABLE else None
+        self._disk = None
+        
+        # 만료 항목 정리 스레드 (daemon - 프로세스 종료를 막지 않음)
+        self._stop_event = threading.Event()
+        self._sweeper = threading.Thread(
+            target=self._sweep_loop,
+            args=(sweep_interval if sweep_interval is not None else default_ttl / 4,),
+            name="fastcache-sweeper",
+            daemon=True
+        )
+        self._sweeper.start()
         
         logger.info(f"FastCache 초기화: max_size={max_size}, ttl={default_ttl}초")
     
+    def _get_disk(self):
+        """디스크 캐시를 처음 필요할 때 생성해 반환 (사용 안 함/생성 실패 시 None)"""
+        if self._disk is None and self._persist_dir:
+            with self._lock:
+                if self._disk is None and self._persist_dir:
+                    try:
+                        self._disk = diskcache.Cache(directory=self._persist_dir,
+                                                     size_limit=DISK_CACHE_SIZE_LIMIT)
+                    except Exception as e:
+                        logger.warning(f"디스크 캐시 초기화 실패 ({self._persist_dir}): {e}")
+                        self._persist_dir = None
+        return self._disk
+    
     def _generate_key(self, query: str, context: str = "") -> str:
         """
         쿼리와 컨텍스트를 기반으로 캐시 키 생성
@@ -59,8 +117,10 @@ class FastCache:
         Returns:
             해시된 캐시 키
         """
-        combined = f"{query}|{context}"
-        return hashlib.md5(combined.encode('utf-8')).hexdigest()
+        combined = f"{query}|{context}".encode('utf-8')
+        if XXHASH_AVAILABLE:
+            return xxhash.xxh3_128_hexdigest(combined)
+        return hashlib.blake2b(combined, digest_size=16).hexdigest()
     
     def get(self, query: str, context: str = "") -> Optional[Any]:
         """
@@ -75,25 +135,53 @@ class FastCache:
         """
         key = self._generate_key(query, context)
         
-        if key not in self.cache:
-            self.misses += 1
-            return None
-        
-        item = self.cache[key]
-        current_time = time.time()
+        with self._lock:
+            item = self.cache.get(key)
+            
+            # TTL 확인 (조회한 키만 즉시 제거, 나머지는 정리 스레드가 처리)
+            if item is not None and time.monotonic() - item.timestamp > item.ttl:
+                del self.cache[key]
+                item = None
+                logger.debug(f"캐시 만료: {key[:8]}...")
+            
+            if item is not None:
+                # 히트 처리 (최근 사용으로 이동)
+                self.cache.move_to_end(key)
+                item.access_count += 1
+                self.hits += 1
+                logger.debug(f"캐시 히트: {key[:8]}...")
+                return item.data
+            
+            if not self._persist_dir:
+                self.misses += 1
+                return None
         
-        # TTL 확인
-        if current_time - item.timestamp > item.ttl:
-            del self.cache[key]
-            self.misses += 1
-            logger.debug(f"캐시 만료: {key[:8]}...")
-            return None
+        # 메모리 미스 -> 디스크 조회 (디스크 I/O는 락 밖에서)
+        return self._get_from_disk(key)
+    
+    def _get_from_disk(self, key: str) -> Optional[Any]:
+        """디스크 캐시 조회, 히트 시 남은 TTL로 메모리에 다시 적재"""
+        try:
+            disk = self._get_disk()
+            data, expire_time = (disk.get(key, default=None, expire_time=True)
+                                 if disk is not None else (None, None))
+        except Exception as e:
+            logger.warning(f"디스크 캐시 조회 실패: {e}")
+            data, expire_time = None, None
         
-        # 히트 처리
-        item.access_count += 1
-        self.hits += 1
-        logger.debug(f"캐시 히트: {key[:8]}...")
-        return item.data
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            
+            ttl = expire_time - time.time() if expire_time is not None else self.default_ttl
+            if key not in self.cache and len(self.cache) >= self.max_size:
+                self._evict_oldest()
+            self.cache[key] = CacheItem(data=data, timestamp=time.monotonic(), ttl=ttl)
+            self.cache.move_to_end(key)
+            self.hits += 1
+        logger.debug(f"디스크 캐시 히트: {key[:8]}...")
+        return data
     
     def put(self, query: str, data: Any, context: str = "", ttl: Optional[float] = None) -> None:
         """
@@ -110,38 +198,49 @@ class FastCache:
         
         key = self._generate_key(query, context)
         
-        # 캐시 크기 제한 확인
-        if len(self.cache) >= self.max_size:
-            self._evict_oldest()
+        with self._lock:
+            # 캐시 크기 제한 확인 (기존 키 갱신은 제거 불필요)
+            if key in self.cache:
+                self.cache.move_to_end(key)
+            elif len(self.cache) >= self.max_size:
+                self._evict_oldest()
+            
+            # 캐시 저장
+            self.cache[key] = CacheItem(
+                data=data,
+                timestamp=time.monotonic(),
+                ttl=ttl
+            )
         
-        # 캐시 저장
-        self.cache[key] = CacheItem(
-            data=data,
-            timestamp=time.time(),
-            ttl=ttl
-        )
+        disk = self._get_disk()
+        if disk is not None:
+            try:
+                disk.set(key, data, expire=ttl)
+            except Exception as e:
+                logger.warning(f"디스크 캐시 저장 실패: {e}")
         
         logger.debug(f"캐시 저장: {key[:8]}...")
     
     def _evict_oldest(self) -> None:
         """
-        가장 오래된 캐시 항목 제거 (LRU)
+        가장 오래된 캐시 항목 제거 (LRU, 락을 잡은 상태에서 호출)
         """
         if not self.cache:
             return
         
-        # 가장 적게 접근된 항목 찾기
-        oldest_key = min(self.cache.keys(), 
-                        key=lambda k: (self.cache[k].access_count, self.cache[k].timestamp))
-        
-        del self.cache[oldest_key]
+        # 가장 오래전에 사용된 항목 (맨 앞)
+        oldest_key, _ = self.cache.popitem(last=False)
         logger.debug(f"캐시 제거 (LRU): {oldest_key[:8]}...")
     
     def clear(self) -> None:
         """캐시 전체 삭제"""
-        self.cache.clear()
-        self.hits = 0
-        self.misses = 0
+        with self._lock:
+            self.cache.clear()
+            self.hits = 0
+            self.misses = 0
+        disk = self._get_disk()
+        if disk is not None:
+            disk.clear()
         logger.info("캐시 전체 삭제")
     
     def get_stats(self) -> Dict[str, Any]:
@@ -160,7 +259,8 @@ class FastCache:
             "hits": self.hits,
             "misses": self.misses,
             "hit_rate": round(hit_rate, 2),
-            "total_requests": total_requests
+            "total_requests": total_requests,
+            "persistent": bool(self._persist_dir)
         }
     
     def cleanup_expired(self) -> int:
@@ -170,25 +270,260 @@ class FastCache:
         Returns:
             정리된 항목 수
         """
-        current_time = time.time()
-        expired_keys = []
+        current_time = time.monotonic()
         
-        for key, item in self.cache.items():
-            if current_time - item.timestamp > item.ttl:
-                expired_keys.append(key)
+        with self._lock:
+            expired_keys = [key for key, item in self.cache.items()
+                            if current_time - item.timestamp > item.ttl]
+            for key in expired_keys:
+                del self.cache[key]
         
-        for key in expired_keys:
-            del self.cache[key]
+        if self._disk is not None:
+            self._disk.expire()
         
         if expired_keys:
             logger.info(f"만료된 캐시 {len(expired_keys)}개 정리")
         
         return len(expired_keys)
+    
+    def _sweep_loop(self, interval: float) -> None:
+        """stop()이 호출될 때까지 interval초마다 만료 항목 정리"""
+        while not self._stop_event.wait(interval):
+            try:
+                self.cleanup_expired()
+            except Exception as e:
+                logger.warning(f"캐시 만료 정리 실패: {e}")
+    
+    def stop(self) -> None:
+        """만료 항목 정리 스레드 종료"""
+        self._stop_event.set()
+
+class SemanticCache:
+    """
+    임베딩 유사도 기반 시맨틱 캐시
+    
+    특징:
+    - 표현만 다른 유사 질문도 히트 (코사인 유사도 >= 임계값)
+    - L2 정규화된 임베딩 행렬과 쿼리의 단일 행렬-벡터 곱으로 검색
+    - 임베딩 행렬은 행별 스케일을 가진 int8로 저장 (float32 대비 메모리/대역폭 1/4)
+    - 컨텍스트 키가 일치하는 항목만 히트
+    - LRU 기반 자동 정리 (OrderedDict 순서 = 최근 사용 순, O(1) 제거)
+    - 만료 항목은 조회 시 점수에서 제외하고 저장 시 일괄 제거
+    """
+    
+    def __init__(self, max_size: int = 500, similarity_threshold: float = 0.92,
+                 default_ttl: float = 1800):
+        """
+        SemanticCache 초기화
+        
+        Args:
+            max_size: 최대 캐시 크기
+            similarity_threshold: 기본 히트 임계값 (코사인 유사도)
+            default_ttl: 기본 TTL (초)
+        """
+        self.max_size = max_size
+        self.similarity_threshold = similarity_threshold
+        self.default_ttl = default_ttl
+        
+        # 슬롯 0..size-1 이 유효한 항목
+        self.embeddings: Optional[np.ndarray] = None  # (max_size, dim) int8
+        self.scales = np.ones(max_size, dtype=np.float32)
+        self.context_hashes = np.zeros(max_size, dtype=np.int64)
+        self.expires_at = np.zeros(max_size, dtype=np.float64)  # time.monotonic() 기준
+        self.items: List[Optional[CacheItem]] = [None] * max_size
+        self.slot_keys: List[Optional[int]] = [None] * max_size
+        self.size = 0
+        
+        # LRU 순서 (항목 키 -> 슬롯, 맨 앞이 가장 오래전에 사용된 항목)
+        # 슬롯은 제거 시 이동하므로 변하지 않는 항목 키로 순서를 관리
+        self._lru: "OrderedDict[int, int]" = OrderedDict()
+        self._next_key = 0
+        
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        logger.info(f"SemanticCache 초기화: max_size={max_size}, threshold={similarity_threshold}")
+    
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        """float32 L2 정규화"""
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+    
+    def get(self, embedding: Optional[np.ndarray], context: str = "",
+            threshold: Optional[float] = None) -> Optional[Any]:
+        """
+        유사한 질문의 캐시 데이터 조회
+        
+        Args:
+            embedding: 질문 임베딩
+            context: 추가 컨텍스트 (정확히 일치해야 히트)
+            threshold: 히트 임계값 (None이면 기본값 사용)
+            
+        Returns:
+            캐시된 데이터 또는 None
+        """
+        if threshold is None:
+            threshold = self.similarity_threshold
+        
+        with self._lock:
+            if embedding is None or self.size == 0:
+                self.misses += 1
+                return None
+            
+            query = self._normalize(embedding)
+            if query.shape[0] != self.embeddings.shape[1]:
+                self.misses += 1
+                return None
+            
+            scores = cosine_scores(self.embeddings[:self.size], query, self.scales[:self.size])
+            # 컨텍스트가 다르거나 만료된 항목은 히트 대상에서 제외 (만료 항목 제거는 put에서)
+            valid = ((self.context_hashes[:self.size] == hash(context))
+                     & (self.expires_at[:self.size] > time.monotonic()))
+            scores[~valid] = -1.0
+            best = int(np.argmax(scores))
+            
+            if scores[best] < threshold:
+                self.misses += 1
+                return None
+            
+            item = self.items[best]
+            self._lru.move_to_end(self.slot_keys[best])
+            item.access_count += 1
+            self.hits += 1
+            logger.debug(f"시맨틱 캐시 히트: slot {best} (유사도: {scores[best]:.3f})")
+            return item.data
+    
+    def put(self, embedding: Optional[np.ndarray], data: Any, context: str = "",
+            ttl: Optional[float] = None) -> None:
+        """
+        캐시에 데이터 저장
+        
+        Args:
+            embedding: 질문 임베딩
+            data: 저장할 데이터
+            context: 추가 컨텍스트
+            ttl: TTL (초, None이면 기본값 사용)
+        """
+        self.put_many([(embedding, data, context)], ttl)
+    
+    def put_many(self, entries: List[Tuple[Optional[np.ndarray], Any, str]],
+                 ttl: Optional[float] = None) -> None:
+        """
+        여러 항목을 한 번의 락 획득으로 저장
+        
+        Args:
+            entries: (임베딩, 데이터, 컨텍스트) 튜플 리스트
+            ttl: TTL (초, None이면 기본값 사용)
+        """
+        if ttl is None:
+            ttl = self.default_ttl
+        
+        # 정규화/양자화는 락 밖에서 수행
+        rows = [(quantize_int8(self._normalize(embedding)), data, context)
+                for embedding, data, context in entries if embedding is not None]
+        if not rows:
+            return
+        
+        timestamp = time.monotonic()
+        with self._lock:
+            self._purge_expired(timestamp)
+            
+            for (quantized, scale), data, context in rows:
+                # 최초 저장 또는 임베딩 모델 변경 시 행렬 재할당
+                if self.embeddings is None or self.embeddings.shape[1] != quantized.shape[0]:
+                    self.embeddings = np.zeros((self.max_size, quantized.shape[0]), dtype=np.int8)
+                    self._reset_slots()
+                
+                if self.size >= self.max_size:
+                    self._evict_oldest()
+                
+                slot = self.size
+                key = self._next_key
+                self._next_key += 1
+                self.embeddings[slot] = quantized
+                self.scales[slot] = scale
+                self.context_hashes[slot] = hash(context)
+                self.expires_at[slot] = timestamp + ttl
+                self.items[slot] = CacheItem(data=data, timestamp=timestamp, ttl=ttl)
+                self.slot_keys[slot] = key
+                self._lru[key] = slot
+                self.size += 1
+    
+    def _reset_slots(self) -> None:
+        """모든 슬롯 비우기 (락을 잡은 상태에서 호출)"""
+        self.items = [None] * self.max_size
+        self.slot_keys = [None] * self.max_size
+        self._lru.clear()
+        self.size = 0
+    
+    def _remove(self, slot: int) -> None:
+        """슬롯 제거 (마지막 슬롯을 빈 자리로 이동, 락을 잡은 상태에서 호출)"""
+        last = self.size - 1
+        del self._lru[self.slot_keys[slot]]
+        if slot != last:
+            self.embeddings[slot] = self.embeddings[last]
+            self.scales[slot] = self.scales[last]
+            self.context_hashes[slot] = self.context_hashes[last]
+            self.expires_at[slot] = self.expires_at[last]
+            self.items[slot] = self.items[last]
+            self.slot_keys[slot] = self.slot_keys[last]
+            self._lru[self.slot_keys[slot]] = slot
+        self.items[last] = None
+        self.slot_keys[last] = None
+        self.size = last
+    
+    def _evict_oldest(self) -> None:
+        """가장 오래전에 사용된 항목 제거 (LRU, 락을 잡은 상태에서 호출)"""
+        victim = next(iter(self._lru.values()))
+        self._remove(victim)
+        logger.debug(f"시맨틱 캐시 제거 (LRU): slot {victim}")
+    
+    def _purge_expired(self, now: float) -> None:
+        """만료된 항목 일괄 제거 (락을 잡은 상태에서 호출)"""
+        expired = np.flatnonzero(self.expires_at[:self.size] <= now)
+        # 뒤 슬롯부터 제거해야 마지막 슬롯 이동이 아직 확인하지 않은 만료 슬롯을 덮지 않음
+        for slot in expired[::-1]:
+            self._remove(int(slot))
+        if expired.size:
+            logger.debug(f"시맨틱 캐시 만료 {expired.size}개 정리")
+    
+    def clear(self) -> None:
+        """캐시 전체 삭제"""
+        with self._lock:
+            self._reset_slots()
+            self.hits = 0
+            self.misses = 0
+        logger.info("시맨틱 캐시 전체 삭제")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        캐시 통계 반환
+        
+        Returns:
+            캐시 통계 딕셔너리
+        """
+        total_requests = self.hits + self.misses
+        hit_rate = (self.hits / total_requests * 100) if total_requests > 0 else 0
+        
+        return {
+            "cache_size": self.size,
+            "max_size": self.max_size,
+            "similarity_threshold": self.similarity_threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(hit_rate, 2),
+            "total_requests": total_requests
+        }
 
 # 전역 캐시 인스턴스들
-question_cache = FastCache(max_size=500, default_ttl=1800)  # 질문-답변 캐시 (30분)
+question_cache = FastCache(max_size=500, default_ttl=1800,   # 질문-답변 캐시 (30분, 재시작 후에도 유지)
+                           persist_dir=os.getenv("QUESTION_CACHE_DIR", "./cache/question"))
 sql_cache = FastCache(max_size=200, default_ttl=3600)       # SQL 쿼리 캐시 (1시간)
 vector_cache = FastCache(max_size=1000, default_ttl=7200)   # 벡터 검색 캐시 (2시간)
+response_cache = SemanticCache(max_size=500, similarity_threshold=0.92, default_ttl=1800)  # /ask 응답 시맨틱 캐시 (30분)
 
 def get_question_cache() -> FastCache:
     """질문-답변 캐시 반환"""
@@ -202,11 +537,16 @@ def get_vector_cache() -> FastCache:
     """벡터 검색 캐시 반환"""
     return vector_cache
 
+def get_response_cache() -> SemanticCache:
+    """/ask 응답 시맨틱 캐시 반환"""
+    return response_cache
+
 def clear_all_caches() -> None:
     """모든 캐시 삭제"""
     question_cache.clear()
     sql_cache.clear()
     vector_cache.clear()
+    response_cache.clear()
     logger.info("모든 캐시 삭제 완료")
 
 def get_all_cache_stats() -> Dict[str, Dict[str, Any]]:
@@ -214,7 +554,8 @@ def get_all_cache_stats() -> Dict[str, Dict[str, Any]]:
     return {
         "question_cache": question_cache.get_stats(),
         "sql_cache": sql_cache.get_stats(),
-        "vector_cache": vector_cache.get_stats()
+        "vector_cache": vector_cache.get_stats(),
+        "response_cache": response_cache.get_stats()
     }
 
 if __name__ == "__main__":
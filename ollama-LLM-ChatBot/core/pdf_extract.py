@@ -0,0 +1,224 @@
+"""
+PDF 텍스트 추출/청크화 모듈 (임베딩 없음)
+
+PDF 라이브러리만 import하므로 PDF 추출 프로세스 풀 작업자가 torch/SBERT를
+로드하지 않고 이 모듈만 import해 실행할 수 있습니다.
+"""
+
+import re
+import hashlib
+import logging
+from dataclasses import dataclass
+from functools import cached_property
+from typing import List, Dict, Tuple, Optional
+
+import numpy as np
+import PyPDF2
+import fitz  # pymupdf
+import pdfplumber
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class TextChunk:
+    """텍스트 청크 데이터 클래스"""
+    content: str
+    page_number: int
+    chunk_id: str
+    embedding: Optional[np.ndarray] = None
+    metadata: Optional[Dict] = None
+    
+    @cached_property
+    def stripped_content(self) -> str:
+        """앞뒤 공백을 제거한 본문 (청크당 한 번만 계산)"""
+        return self.content.strip()
+    
+    @cached_property
+    def char_len(self) -> int:
+        """stripped_content 길이 (청크당 한 번만 계산)"""
+        return len(self.stripped_content)
+
+def extract_text_from_pdf(pdf_path: str) -> Tuple[str, Dict]:
+    """
+    다중 라이브러리를 사용하여 PDF에서 텍스트 추출
+    
+    Args:
+        pdf_path: PDF 파일 경로
+        
+    Returns:
+        (전체_텍스트, 메타데이터)
+    """
+    full_text = ""
+    metadata = {"pages": 0, "extraction_method": []}
+    
+    # 1. PyPDF2로 시도
+    try:
+        with open(pdf_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            metadata["pages"] = len(pdf_reader.pages)
+            
+            for page_num, page in enumerate(pdf_reader.pages):
+                text = page.extract_text()
+                if text.strip():
+                    full_text += f"\n--- 페이지 {page_num + 1} ---\n{text}\n"
+            
+            if full_text.strip():
+                metadata["extraction_method"].append("PyPDF2")
+                logger.info("PyPDF2로 텍스트 추출 성공")
+                
+    except Exception as e:
+        logger.warning(f"PyPDF2 추출 실패: {e}")
+    
+    # 2. PyMuPDF (fitz)로 보완
+    if not full_text.strip():
+        try:
+            doc = fitz.open(pdf_path)
+            metadata["pages"] = doc.page_count
+            
+            for page_num in range(doc.page_count):
+                page = doc[page_num]
+                text = page.get_text()
+                if text.strip():
+                    full_text += f"\n--- 페이지 {page_num + 1} ---\n{text}\n"
+            
+            if full_text.strip():
+                metadata["extraction_method"].append("PyMuPDF")
+                logger.info("PyMuPDF로 텍스트 추출 성공")
+                
+            doc.close()
+            
+        except Exception as e:
+            logger.warning(f"PyMuPDF 추출 실패: {e}")
+    
+    # 3. pdfplumber로 최종 시도
+    if not full_text.strip():
+        try:
+            with pdfplumber.open(pdf_path) as pdf:
+                metadata["pages"] = len(pdf.pages)
+                
+                for page_num, page in enumerate(pdf.pages):
+                    text = page.extract_text()
+                    if text:
+                        full_text += f"\n--- 페이지 {page_num + 1} ---\n{text}\n"
+                
+                if full_text.strip():
+                    metadata["extraction_method"].append("pdfplumber")
+                    logger.info("pdfplumber로 텍스트 추출 성공")
+                    
+        except Exception as e:
+            logger.error(f"모든 PDF 추출 방법 실패: {e}")
+            raise Exception("PDF 텍스트 추출에 실패했습니다.")
+    
+    # 텍스트 전처리
+    full_text = preprocess_text(full_text)
+    metadata["total_characters"] = len(full_text)
+    
+    return full_text, metadata
+
+def preprocess_text(text: str) -> str:
+    """
+    추출된 텍스트 전처리
+    
+    Args:
+        text: 원본 텍스트
+        
+    Returns:
+        전처리된 텍스트
+    """
+    # 불필요한 공백 제거
+    text = re.sub(r'\s+', ' ', text)
+    
+    # 페이지 구분자 정리
+    text = re.sub(r'--- 페이지 \d+ ---', '\n\n', text)
+    
+    # 연속된 줄바꿈 정리
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    
+    return text.strip()
+
+def create_text_chunks(text: str, pdf_id: str, chunk_size: int) -> List[TextChunk]:
+    """
+    텍스트를 의미적 단위로 청크화
+    
+    Args:
+        text: 전체 텍스트
+        pdf_id: PDF 식별자
+        
+    Returns:
+        TextChunk 리스트
+    """
+    chunks = []
+    
+    # 문단 단위로 우선 분할
+    paragraphs = text.split('\n\n')
+    
+    current_chunk = ""
+    current_page = 1
+    chunk_counter = 0
+    
+    for paragraph in paragraphs:
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        
+        # 페이지 번호 추출 (만약 있다면)
+        page_match = re.search(r'페이지 (\d+)', paragraph)
+        if page_match:
+            current_page = int(page_match.group(1))
+            continue
+        
+        # 청크 크기 체크
+        if len(current_chunk) + len(paragraph) <= chunk_size:
+            current_chunk += paragraph + "\n\n"
+        else:
+            # 현재 청크 저장
+            if current_chunk.strip():
+                chunk_id = f"{pdf_id}_chunk_{chunk_counter}"
+                chunks.append(TextChunk(
+                    content=current_chunk.strip(),
+                    page_number=current_page,
+                    chunk_id=chunk_id,
+                    metadata={"pdf_id": pdf_id, "chunk_index": chunk_counter}
+                ))
+                chunk_counter += 1
+            
+            # 새 청크 시작 (오버랩 고려)
+            current_chunk = paragraph + "\n\n"
+    
+    # 마지막 청크 처리
+    if current_chunk.strip():
+        chunk_id = f"{pdf_id}_chunk_{chunk_counter}"
+        chunks.append(TextChunk(
+            content=current_chunk.strip(),
+            page_number=current_page,
+            chunk_id=chunk_id,
+            metadata={"pdf_id": pdf_id, "chunk_index": chunk_counter}
+        ))
+    
+    logger.info(f"총 {len(chunks)}개의 텍스트 청크 생성")
+    return chunks
+
+def extract_chunks(pdf_path: str, chunk_size: int) -> Tuple[List[TextChunk], Dict]:
+    """
+    텍스트 추출 및 청크화 (임베딩 제외, 프로세스 풀 작업자로도 사용)
+    
+    Args:
+        pdf_path: PDF 파일 경로
+        chunk_size: 청크 최대 문자 수
+        
+    Returns:
+        (임베딩이 없는 청크 리스트, 메타데이터)
+    """
+    # PDF ID 생성 (파일 경로 해시)
+    pdf_id = hashlib.md5(pdf_path.encode()).hexdigest()[:8]
+    
+    logger.info(f"PDF 처리 시작: {pdf_path}")
+    
+    # 1. 텍스트 추출
+    full_text, metadata = extract_text_from_pdf(pdf_path)
+    
+    # 2. 청크화
+    chunks = create_text_chunks(full_text, pdf_id, chunk_size)
+    metadata["pdf_id"] = pdf_id
+    
+    return chunks, metadata
@@ -6,32 +6,28 @@ PDF 텍스트 추출 및 임베딩 생성 모듈
 """
 
 import os
-import re
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass
-import hashlib
 
-import PyPDF2
-import fitz  # pymupdf
-import pdfplumber
-import numpy as np
 from sentence_transformers import SentenceTransformer
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+
+from .pdf_extract import (
+    TextChunk,
+    extract_chunks,
+    extract_text_from_pdf,
+    preprocess_text,
+    create_text_chunks,
+)
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
-class TextChunk:
-    """텍스트 청크 데이터 클래스"""
-    content: str
-    page_number: int
-    chunk_id: str
-    embedding: Optional[np.ndarray] = None
-    metadata: Optional[Dict] = None
+# 한 번의 encode 호출에서 처리할 최대 청크 수
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
 
 class PDFProcessor:
     """
@@ -52,7 +48,7 @@ class PDFProcessor:
         PDFProcessor 초기화
         
         Args:
-            embedding_model: 한국어 특화 임베딩 모델
+            embedding_model: 한국어 특화 임베딩 모델 (None이면 텍스트 추출/청크화 전용)
             chunk_size: 청크 크기 (토큰 단위)
             chunk_overlap: 청크 간 겹치는 부분
         """
@@ -60,12 +56,14 @@ class PDFProcessor:
         self.chunk_overlap = chunk_overlap
         
         # 한국어 특화 임베딩 모델 로드
-        try:
-            self.embedding_model = SentenceTransformer(embedding_model)
-            logger.info(f"임베딩 모델 로드 완료: {embedding_model}")
-        except Exception as e:
-            logger.warning(f"한국어 모델 로드 실패, 기본 모델 사용: {e}")
-            self.embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+        self.embedding_model = None
+        if embedding_model is not None:
+            try:
+                self.embedding_model = SentenceTransformer(embedding_model)
+                logger.info(f"임베딩 모델 로드 완료: {embedding_model}")
+            except Exception as e:
+                logger.warning(f"한국어 모델 로드 실패, 기본 모델 사용: {e}")
+                self.embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
         
         # TF-IDF 벡터라이저 (키워드 기반 검색용)
         self.tfidf_vectorizer = TfidfVectorizer(
@@ -75,164 +73,16 @@ class PDFProcessor:
         )
     
     def extract_text_from_pdf(self, pdf_path: str) -> Tuple[str, Dict]:
-        """
-        다중 라이브러리를 사용하여 PDF에서 텍스트 추출
-        
-        Args:
-            pdf_path: PDF 파일 경로
-            
-        Returns:
-            (전체_텍스트, 메타데이터)
-        """
-        full_text = ""
-        metadata = {"pages": 0, "extraction_method": []}
-        
-        # 1. PyPDF2로 시도
-        try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                metadata["pages"] = len(pdf_reader.pages)
-                
-                for page_num, page in enumerate(pdf_reader.pages):
-                    text = page.extract_text()
-                    if text.strip():
-                        full_text += f"\n--- 페이지 {page_num + 1} ---\n{text}\n"
-                
-                if full_text.strip():
-                    metadata["extraction_method"].append("PyPDF2")
-                    logger.info("PyPDF2로 텍스트 추출 성공")
-                    
-        except Exception as e:
-            logger.warning(f"PyPDF2 추출 실패: {e}")
-        
-        # 2. PyMuPDF (fitz)로 보완
-        if not full_text.strip():
-            try:
-                doc = fitz.open(pdf_path)
-                metadata["pages"] = doc.page_count
-                
-                for page_num in range(doc.page_count):
-                    page = doc[page_num]
-                    text = page.get_text()
-                    if text.strip():
-                        full_text += f"\n--- 페이지 {page_num + 1} ---\n{text}\n"
-                
-                if full_text.strip():
-                    metadata["extraction_method"].append("PyMuPDF")
-                    logger.info("PyMuPDF로 텍스트 추출 성공")
-                    
-                doc.close()
-                
-            except Exception as e:
-                logger.warning(f"PyMuPDF 추출 실패: {e}")
-        
-        # 3. pdfplumber로 최종 시도
-        if not full_text.strip():
-            try:
-                with pdfplumber.open(pdf_path) as pdf:
-                    metadata["pages"] = len(pdf.pages)
-                    
-                    for page_num, page in enumerate(pdf.pages):
-                        text = page.extract_text()
-                        if text:
-                            full_text += f"\n--- 페이지 {page_num + 1} ---\n{text}\n"
-                    
-                    if full_text.strip():
-                        metadata["extraction_method"].append("pdfplumber")
-                        logger.info("pdfplumber로 텍스트 추출 성공")
-                        
-            except Exception as e:
-                logger.error(f"모든 PDF 추출 방법 실패: {e}")
-                raise Exception("PDF 텍스트 추출에 실패했습니다.")
-        
-        # 텍스트 전처리
-        full_text = self._preprocess_text(full_text)
-        metadata["total_characters"] = len(full_text)
-        
-        return full_text, metadata
+        """다중 라이브러리를 사용하여 PDF에서 텍스트 추출 (전처리 포함)"""
+        return extract_text_from_pdf(pdf_path)
     
     def _preprocess_text(self, text: str) -> str:
-        """
-        추출된 텍스트 전처리
-        
-        Args:
-            text: 원본 텍스트
-            
-        Returns:
-            전처리된 텍스트
-        """
-        # 불필요한 공백 제거
-        text = re.sub(r'\s+', ' ', text)
-        
-        # 페이지 구분자 정리
-        text = re.sub(r'--- 페이지 \d+ ---', '\n\n', text)
-        
-        # 연속된 줄바꿈 정리
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        
-        return text.strip()
+        """추출된 텍스트 전처리"""
+        return preprocess_text(text)
     
     def create_text_chunks(self, text: str, pdf_id: str) -> List[TextChunk]:
-        """
-        텍스트를 의미적 단위로 청크화
-        
-        Args:
-            text: 전체 텍스트
-            pdf_id: PDF 식별자
-            
-        Returns:
-            TextChunk 리스트
-        """
-        chunks = []
-        
-        # 문단 단위로 우선 분할
-        paragraphs = text.split('\n\n')
-        
-        current_chunk = ""
-        current_page = 1
-        chunk_counter = 0
-        
-        for paragraph in paragraphs:
-            paragraph = paragraph.strip()
-            if not paragraph:
-                continue
-            
-            # 페이지 번호 추출 (만약 있다면)
-            page_match = re.search(r'페이지 (\d+)', paragraph)
-            if page_match:
-                current_page = int(page_match.group(1))
-                continue
-            
-            # 청크 크기 체크
-            if len(current_chunk) + len(paragraph) <= self.chunk_size:
-                current_chunk += paragraph + "\n\n"
-            else:
-                # 현재 청크 저장
-                if current_chunk.strip():
-                    chunk_id = f"{pdf_id}_chunk_{chunk_counter}"
-                    chunks.append(TextChunk(
-                        content=current_chunk.strip(),
-                        page_number=current_page,
-                        chunk_id=chunk_id,
-                        metadata={"pdf_id": pdf_id, "chunk_index": chunk_counter}
-                    ))
-                    chunk_counter += 1
-                
-                # 새 청크 시작 (오버랩 고려)
-                current_chunk = paragraph + "\n\n"
-        
-        # 마지막 청크 처리
-        if current_chunk.strip():
-            chunk_id = f"{pdf_id}_chunk_{chunk_counter}"
-            chunks.append(TextChunk(
-                content=current_chunk.strip(),
-                page_number=current_page,
-                chunk_id=chunk_id,
-                metadata={"pdf_id": pdf_id, "chunk_index": chunk_counter}
-            ))
-        
-        logger.info(f"총 {len(chunks)}개의 텍스트 청크 생성")
-        return chunks
+        """텍스트를 의미적 단위로 청크화"""
+        return create_text_chunks(text, pdf_id, self.chunk_size)
     
     def generate_embeddings(self, chunks: List[TextChunk]) -> List[TextChunk]:
         """
@@ -250,7 +100,7 @@ class PDFProcessor:
             # 배치 처리로 임베딩 생성 (메모리 효율성)
             embeddings = self.embedding_model.encode(
                 texts, 
-                batch_size=32, 
+                batch_size=EMBED_BATCH_SIZE, 
                 show_progress_bar=True,
                 convert_to_numpy=True
             )
@@ -267,6 +117,18 @@ class PDFProcessor:
         
         return chunks
     
+    def extract_chunks(self, pdf_path: str) -> Tuple[List[TextChunk], Dict]:
+        """
+        텍스트 추출 및 청크화 (임베딩 제외)
+        
+        Args:
+            pdf_path: PDF 파일 경로
+            
+        Returns:
+            (임베딩이 없는 청크 리스트, 메타데이터)
+        """
+        return extract_chunks(pdf_path, self.chunk_size)
+    
     def process_pdf(self, pdf_path: str) -> Tuple[List[TextChunk], Dict]:
         """
         PDF 파일 전체 처리 파이프라인
@@ -277,23 +139,13 @@ class PDFProcessor:
         Returns:
             (임베딩이 포함된 청크 리스트, 메타데이터)
         """
-        # PDF ID 생성 (파일 경로 해시)
-        pdf_id = hashlib.md5(pdf_path.encode()).hexdigest()[:8]
-        
-        logger.info(f"PDF 처리 시작: {pdf_path}")
-        
-        # 1. 텍스트 추출
-        full_text, metadata = self.extract_text_from_pdf(pdf_path)
-        
-        # 2. 청크화
-        chunks = self.create_text_chunks(full_text, pdf_id)
+        chunks, metadata = self.extract_chunks(pdf_path)
         
         # 3. 임베딩 생성
         chunks_with_embeddings = self.generate_embeddings(chunks)
         
         # 메타데이터 업데이트
         metadata.update({
-            "pdf_id": pdf_id,
             "total_chunks": len(chunks_with_embeddings),
             "embedding_model": self.embedding_model.get_sentence_embedding_dimension()
         })
@@ -301,6 +153,69 @@ class PDFProcessor:
         logger.info(f"PDF 처리 완료: {len(chunks_with_embeddings)}개 청크")
         
         return chunks_with_embeddings, metadata
+    
+    def process_pdfs(self, pdf_paths: List[str],
+                     max_workers: Optional[int] = None) -> Tuple[Dict[str, Tuple[List[TextChunk], Dict]], Dict[str, str]]:
+        """
+        여러 PDF를 병렬로 추출/청크화한 뒤 전체 청크를 한 번에 임베딩
+        
+        텍스트 추출은 CPU 바운드이므로 프로세스 풀에서 파일별로 병렬 실행하고,
+        임베딩은 모든 PDF의 청크를 모아 EMBED_BATCH_SIZE 단위로 일괄 처리합니다.
+        
+        Args:
+            pdf_paths: PDF 파일 경로 리스트
+            max_workers: 추출 프로세스 수 (None이면 min(파일 수, CPU 수))
+            
+        Returns:
+            ({pdf_path: (임베딩이 포함된 청크 리스트, 메타데이터)}, {pdf_path: 오류 메시지})
+        """
+        results: Dict[str, Tuple[List[TextChunk], Dict]] = {}
+        errors: Dict[str, str] = {}
+        if not pdf_paths:
+            return results, errors
+        
+        workers = max_workers or min(len(pdf_paths), os.cpu_count() or 1)
+        
+        # 1. 텍스트 추출 + 청크화
+        if workers <= 1:
+            # 파일이 하나뿐이면 프로세스 생성 비용이 더 크므로 현재 프로세스에서 처리
+            for pdf_path in pdf_paths:
+                try:
+                    results[pdf_path] = extract_chunks(pdf_path, self.chunk_size)
+                except Exception as e:
+                    logger.error(f"PDF 텍스트 추출 실패 {pdf_path}: {e}")
+                    errors[pdf_path] = str(e)
+        else:
+            # torch가 로드된 프로세스에서 fork하면 교착될 수 있으므로 spawn 사용
+            # 작업자는 PDF 라이브러리만 import하는 pdf_extract.extract_chunks만 실행
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context("spawn")) as executor:
+                futures = {
+                    pdf_path: executor.submit(extract_chunks, pdf_path, self.chunk_size)
+                    for pdf_path in pdf_paths
+                }
+                for pdf_path, future in futures.items():
+                    try:
+                        results[pdf_path] = future.result()
+                    except Exception as e:
+                        logger.error(f"PDF 텍스트 추출 실패 {pdf_path}: {e}")
+                        errors[pdf_path] = str(e)
+        
+        # 2. 전체 청크 일괄 임베딩
+        all_chunks = [chunk for chunks, _ in results.values() for chunk in chunks]
+        if all_chunks:
+            self.generate_embeddings(all_chunks)
+        
+        dimension = self.embedding_model.get_sentence_embedding_dimension()
+        for chunks, metadata in results.values():
+            metadata.update({
+                "total_chunks": len(chunks),
+                "embedding_model": dimension
+            })
+        
+        logger.info(f"PDF 일괄 처리 완료: {len(results)}개 파일, {len(all_chunks)}개 청크")
+        
+        return results, errors
 
 # 파인튜닝 관련 함수들
 def prepare_training_data(pdf_chunks: List[TextChunk], 
@@ -4,6 +4,13 @@
 SBERT는 라우팅용으로만 사용하여 질문을 적절한 처리 파이프라인으로 분기
 """
 
+import os
+import re
+import json
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
 import numpy as np
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
@@ -17,8 +24,27 @@ except ImportError:
     SBERT_AVAILABLE = False
     logging.warning("sentence-transformers 라이브러리를 찾을 수 없습니다.")
 
+try:
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# 라우팅 결과 LRU 캐시 크기
+ROUTE_CACHE_SIZE = 4096
+
+# 라우팅 캐시 키 정규화용 (연속 공백을 하나로)
+_WS_RE = re.compile(r"\s+")
+
+# CPU에서 라우팅용 SBERT의 Linear 층을 int8 동적 양자화 (참조/질의 임베딩 모두 같은 모델로 계산)
+# 코사인 점수가 달라져 고정 임계값(0.3/0.4/0.5) 기준 라우팅이 바뀔 수 있으므로 기본은 비활성화
+ROUTER_SBERT_INT8 = os.getenv("ROUTER_SBERT_INT8", "0") == "1"
+
+# 참조 질문 임베딩 디스크 캐시 (모델/참조 질문 내용 해시별, 재시작 시 인코딩 생략)
+ROUTER_CACHE_DIR = os.getenv("ROUTER_CACHE_DIR", "./cache/router")
+
 class QueryRoute(Enum):
     """쿼리 라우팅 경로"""
     PDF_SEARCH = "pdf_search"      # PDF 문서 검색
@@ -44,13 +70,24 @@ class QueryRouter:
     3. 빠른 의사결정을 위한 임베딩 기반 유사도 계산
     """
     
-    def __init__(self, embedding_model: str = "jhgan/ko-sroberta-multitask"):
-        """쿼리 라우터 초기화"""
+    def __init__(self, embedding_model: str = "jhgan/ko-sroberta-multitask",
+                 include_scores: bool = False):
+        """
+        쿼리 라우터 초기화
+        
+        Args:
+            embedding_model: 라우팅용 SBERT 모델 이름
+            include_scores: True면 결과 metadata에 라우트별 유사도 전체를 담음 (디버깅용)
+        """
+        self.include_scores = include_scores
+        self.embedding_model_name = embedding_model
         
         self.embedding_model = None
         if SBERT_AVAILABLE:
             try:
                 self.embedding_model = SentenceTransformer(embedding_model)
+                if ROUTER_SBERT_INT8:
+                    self.embedding_model = self._quantize_int8(self.embedding_model)
                 logger.info(f"✅ 라우팅용 SBERT 모델 로드: {embedding_model}")
             except Exception as e:
                 logger.warning(f"SBERT 모델 로드 실패: {e}")
@@ -100,21 +137,130 @@ class QueryRouter:
         
         # 참조 질문들의 임베딩 미리 계산
         self.reference_embeddings = {}
+        # 모든 참조 임베딩을 L2 정규화해 한 행렬로 쌓음 (라우트별 시작 행은 _ref_offsets)
+        self._ref_matrix: Optional[np.ndarray] = None
+        self._ref_routes: List[QueryRoute] = []
+        self._ref_offsets: Optional[np.ndarray] = None
+        self._route_index: Dict[QueryRoute, int] = {}
         if self.embedding_model:
             self._precompute_embeddings()
+        
+        # 정규화된 질문 기준 라우팅 결과 캐시 (인스턴스별 LRU, 라우팅은 스레드에서 실행되므로 락 사용)
+        self._route_cache: "OrderedDict[str, RouteResult]" = OrderedDict()
+        self._route_cache_lock = threading.Lock()
+    
+    @staticmethod
+    def _quantize_int8(model):
+        """CPU 모델이면 Linear 층을 int8 동적 양자화한 복사본 반환 (실패 시 원본 유지)"""
+        if not TORCH_AVAILABLE or model.device.type != "cpu":
+            return model
+        try:
+            quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            logger.info("라우팅용 SBERT int8 동적 양자화 적용")
+            return quantized
+        except Exception as e:
+            logger.warning(f"SBERT 양자화 실패, fp32 사용: {e}")
+            return model
     
     def _precompute_embeddings(self):
         """참조 질문들의 임베딩 미리 계산"""
         try:
-            for route, questions in self.reference_questions.items():
-                embeddings = self.embedding_model.encode(questions)
-                self.reference_embeddings[route] = embeddings
-                logger.debug(f"임베딩 계산 완료: {route.value} ({len(questions)}개)")
+            # 모든 라우트의 참조 질문을 한 배치로 인코딩 후 라우트별로 분리
+            routes = list(self.reference_questions)
+            flat = [q for route in routes for q in self.reference_questions[route]]
+            cache_path = self._reference_cache_path()
+            embeddings = self._load_cached_embeddings(cache_path, len(flat))
+            if embeddings is None:
+                embeddings = self._encode(flat, batch_size=64)
+                self._save_cached_embeddings(cache_path, embeddings)
+            
+            start = 0
+            for route in routes:
+                end = start + len(self.reference_questions[route])
+                self.reference_embeddings[route] = embeddings[start:end]
+                start = end
+            logger.debug(f"임베딩 계산 완료: {len(routes)}개 라우트 ({len(flat)}개)")
             
+            self._stack_reference_embeddings()
             logger.info("✅ 참조 질문 임베딩 사전 계산 완료")
         except Exception as e:
             logger.error(f"임베딩 사전 계산 실패: {e}")
     
+    def _reference_cache_path(self) -> str:
+        """모델 설정 + 참조 질문 내용의 해시로 캐시 파일 경로 결정"""
+        payload = json.dumps({
+            "model": self.embedding_model_name,
+            "int8": ROUTER_SBERT_INT8,
+            "device": str(self.embedding_model.device),
+            "questions": [[route.value, questions] for route, questions in self.reference_questions.items()]
+        }, ensure_ascii=False, sort_keys=True)
+        key = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(ROUTER_CACHE_DIR, f"reference_{key}.npy")
+    
+    @staticmethod
+    def _load_cached_embeddings(path: str, expected_rows: int) -> Optional[np.ndarray]:
+        """캐시된 참조 임베딩 로드 (없거나 형태가 다르면 None)"""
+        if not os.path.exists(path):
+            return None
+        try:
+            embeddings = np.load(path)
+        except Exception as e:
+            logger.warning(f"참조 임베딩 캐시 로드 실패: {e}")
+            return None
+        if embeddings.ndim != 2 or len(embeddings) != expected_rows:
+            return None
+        logger.debug(f"참조 임베딩 캐시 사용: {path}")
+        return embeddings
+    
+    @staticmethod
+    def _save_cached_embeddings(path: str, embeddings: np.ndarray) -> None:
+        """참조 임베딩을 임시 파일에 쓴 뒤 os.replace로 원자적 교체"""
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".npy.tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.save(f, embeddings)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except Exception as e:
+            logger.warning(f"참조 임베딩 캐시 저장 실패: {e}")
+    
+    def _encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """
+        SBERT 인코딩 (autograd 추적 없이 inference_mode에서 실행)
+        
+        L2 정규화된 float32 C-연속 행렬을 반환하므로 코사인 유사도 = 내적
+        """
+        kwargs = dict(batch_size=batch_size, show_progress_bar=False,
+                      convert_to_numpy=True, normalize_embeddings=True)
+        if TORCH_AVAILABLE:
+            with torch.inference_mode():
+                embeddings = self.embedding_model.encode(texts, **kwargs)
+        else:
+            embeddings = self.embedding_model.encode(texts, **kwargs)
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+    
+    def _stack_reference_embeddings(self):
+        """라우트별 임베딩(_encode에서 정규화됨)을 float32 연속 행렬 하나로 합침"""
+        routes = [route for route, emb in self.reference_embeddings.items() if len(emb)]
+        if not routes:
+            self._ref_matrix, self._ref_routes, self._ref_offsets = None, [], None
+            self._route_index = {}
+            return
+        
+        matrix = np.ascontiguousarray(
+            np.concatenate([self.reference_embeddings[route] for route in routes]), dtype=np.float32
+        )
+        
+        sizes = [len(self.reference_embeddings[route]) for route in routes]
+        self._ref_matrix = matrix
+        self._ref_routes = routes
+        self._route_index = {route: i for i, route in enumerate(routes)}
+        self._ref_offsets = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.intp)
+    
     def route_query(self, question: str) -> RouteResult:
         """
         질문을 적절한 파이프라인으로 라우팅
@@ -125,90 +271,161 @@ class QueryRouter:
         Returns:
             라우팅 결과
         """
-        # "방법" 키워드가 있으면 우선적으로 PDF 검색으로 라우팅
-        if '방법' in question.lower():
-            return RouteResult(
-                route=QueryRoute.PDF_SEARCH,
-                confidence=0.95,
-                reasoning="우선 규칙: '방법' 키워드 감지 - PDF 검색으로 라우팅"
-            )
-        
-        if not self.embedding_model or not self.reference_embeddings:
-            # SBERT를 사용할 수 없는 경우 규칙 기반 폴백
-            return self._rule_based_routing(question)
+        return self.route_batch([question])[0]
+    
+    def route_batch(self, questions: List[str]) -> List[RouteResult]:
+        """
+        여러 질문을 한 번에 라우팅 (캐시 미스만 모아 SBERT 인코딩 1회)
         
-        try:
-            # 질문 임베딩 생성
-            query_embedding = self.embedding_model.encode([question])[0]
-            
-            # 각 라우트와의 유사도 계산
-            route_scores = {}
-            
-            for route, ref_embeddings in self.reference_embeddings.items():
-                # 코사인 유사도 계산
-                similarities = np.dot(ref_embeddings, query_embedding) / (
-                    np.linalg.norm(ref_embeddings, axis=1) * np.linalg.norm(query_embedding)
-                )
-                
-                # 최대 유사도 사용
-                max_similarity = float(np.max(similarities))
-                route_scores[route] = max_similarity
-                
-                logger.debug(f"라우트 {route.value}: 최대 유사도 {max_similarity:.3f}")
-            
-            # 최고 점수 라우트 선택
-            best_route = max(route_scores, key=route_scores.get)
-            best_score = route_scores[best_route]
-            
-            # 신뢰도 임계값 검사
-            if best_score < 0.3:
-                return RouteResult(
-                    route=QueryRoute.UNKNOWN,
-                    confidence=best_score,
-                    reasoning=f"모든 라우트의 유사도가 낮음 (최대: {best_score:.3f})"
-                )
-            
-            # SQL vs PDF 구분 로직
-            sql_score = route_scores.get(QueryRoute.SQL_QUERY, 0.0)
-            pdf_score = route_scores.get(QueryRoute.PDF_SEARCH, 0.0)
-            greeting_score = route_scores.get(QueryRoute.GREETING, 0.0)
-            
-            # 인사말이 가장 높은 경우
-            if greeting_score > 0.5 and greeting_score > max(sql_score, pdf_score):
-                return RouteResult(
-                    route=QueryRoute.GREETING,
-                    confidence=greeting_score,
-                    reasoning=f"인사말로 분류 (유사도: {greeting_score:.3f})",
-                    metadata={"scores": route_scores}
-                )
+        Args:
+            questions: 사용자 질문 목록
             
-            # SQL과 PDF 중 선택
-            if sql_score > pdf_score and sql_score > 0.4:
-                return RouteResult(
-                    route=QueryRoute.SQL_QUERY,
-                    confidence=sql_score,
-                    reasoning=f"SQL 쿼리로 분류 (SQL: {sql_score:.3f} vs PDF: {pdf_score:.3f})",
-                    metadata={"scores": route_scores}
-                )
-            elif pdf_score > 0.4:
-                return RouteResult(
+        Returns:
+            질문 순서대로의 라우팅 결과
+        """
+        keys = [self._normalize(question) for question in questions]
+        results = [self._cache_get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            # 같은 배치 안의 중복 질문은 한 번만 계산 (SBERT에는 대소문자를 유지한 원문 전달)
+            texts: Dict[str, str] = {}
+            for i in missing:
+                texts.setdefault(keys[i], _WS_RE.sub(" ", questions[i]).strip())
+            unique = list(texts)
+            computed = dict(zip(unique, self._route_uncached_batch(unique, list(texts.values()))))
+            for key, result in computed.items():
+                self._cache_put(key, result)
+            for i in missing:
+                results[i] = computed[keys[i]]
+        return results
+    
+    @staticmethod
+    def _normalize(question: str) -> str:
+        """소문자화 + 공백 정리 (캐시 키와 키워드 규칙용, SBERT 입력으로는 쓰지 않음)"""
+        return _WS_RE.sub(" ", question.lower()).strip()
+    
+    def _cache_get(self, key: str) -> Optional[RouteResult]:
+        """라우팅 캐시 조회 (히트 시 최근 사용으로 이동)"""
+        with self._route_cache_lock:
+            result = self._route_cache.get(key)
+            if result is not None:
+                self._route_cache.move_to_end(key)
+            return result
+    
+    def _cache_put(self, key: str, result: RouteResult) -> None:
+        """라우팅 캐시 저장 (LRU, ROUTE_CACHE_SIZE 초과 시 가장 오래된 항목 제거)"""
+        with self._route_cache_lock:
+            self._route_cache[key] = result
+            self._route_cache.move_to_end(key)
+            if len(self._route_cache) > ROUTE_CACHE_SIZE:
+                self._route_cache.popitem(last=False)
+    
+    def _route_uncached_batch(self, questions: List[str], texts: List[str]) -> List[RouteResult]:
+        """
+        캐시를 거치지 않는 실제 라우팅
+        
+        Args:
+            questions: _normalize된 질문 (키워드 규칙용)
+            texts: 공백만 정리한 원문 질문 (SBERT 인코딩용, 참조 질문과 같은 대소문자 유지)
+        """
+        results: List[Optional[RouteResult]] = [None] * len(questions)
+        pending = []
+        for i, question in enumerate(questions):
+            # "방법" 키워드가 있으면 우선적으로 PDF 검색으로 라우팅
+            if '방법' in question:
+                results[i] = RouteResult(
                     route=QueryRoute.PDF_SEARCH,
-                    confidence=pdf_score,
-                    reasoning=f"PDF 검색으로 분류 (PDF: {pdf_score:.3f} vs SQL: {sql_score:.3f})",
-                    metadata={"scores": route_scores}
+                    confidence=0.95,
+                    reasoning="우선 규칙: '방법' 키워드 감지 - PDF 검색으로 라우팅"
                 )
             else:
-                # 둘 다 낮은 경우 기본값 (PDF 검색)
-                return RouteResult(
-                    route=QueryRoute.PDF_SEARCH,
-                    confidence=max(sql_score, pdf_score),
-                    reasoning=f"기본 라우트 (PDF 검색) 선택",
-                    metadata={"scores": route_scores}
-                )
-                
+                pending.append(i)
+        if not pending:
+            return results
+        
+        if not self.embedding_model or self._ref_matrix is None:
+            # SBERT를 사용할 수 없는 경우 규칙 기반 폴백
+            for i in pending:
+                results[i] = self._rule_based_routing(questions[i])
+            return results
+        
+        try:
+            # 질문 임베딩 일괄 생성 (정규화되어 있으므로 코사인 유사도 = 내적)
+            embeddings = self._encode([texts[i] for i in pending], batch_size=len(pending))
+            
+            # 모든 질문 x 모든 참조 질문 유사도를 한 번에 계산 후 라우트별 최대값
+            similarities = embeddings @ self._ref_matrix.T
+            max_similarities = np.maximum.reduceat(similarities, self._ref_offsets, axis=1)
+            for i, scores in zip(pending, max_similarities):
+                logger.debug("라우트별 최대 유사도: %s", scores)
+                results[i] = self._route_from_scores(scores)
         except Exception as e:
             logger.error(f"SBERT 라우팅 실패: {e}")
-            return self._rule_based_routing(question)
+            for i in pending:
+                results[i] = self._rule_based_routing(questions[i])
+        return results
+    
+    def _route_score(self, scores: np.ndarray, route: QueryRoute) -> float:
+        """라우트별 최대 유사도 배열에서 해당 라우트 점수 (참조 질문이 없으면 0)"""
+        index = self._route_index.get(route)
+        return float(scores[index]) if index is not None else 0.0
+    
+    def _route_from_scores(self, scores: np.ndarray) -> RouteResult:
+        """라우트별 최대 유사도 배열(_ref_routes 순서)로 최종 라우트 결정"""
+        # 최고 점수 라우트 선택
+        best_score = float(scores[int(scores.argmax())])
+        
+        # 신뢰도 임계값 검사
+        if best_score < 0.3:
+            return RouteResult(
+                route=QueryRoute.UNKNOWN,
+                confidence=best_score,
+                reasoning=f"모든 라우트의 유사도가 낮음 (최대: {best_score:.3f})"
+            )
+        
+        # SQL vs PDF 구분 로직
+        sql_score = self._route_score(scores, QueryRoute.SQL_QUERY)
+        pdf_score = self._route_score(scores, QueryRoute.PDF_SEARCH)
+        greeting_score = self._route_score(scores, QueryRoute.GREETING)
+        
+        # 라우트별 전체 점수 dict는 요청된 경우에만 생성
+        if self.include_scores:
+            metadata = {"scores": dict(zip(self._ref_routes, scores.tolist()))}
+        else:
+            metadata = {"top_score": best_score}
+        
+        # 인사말이 가장 높은 경우
+        if greeting_score > 0.5 and greeting_score > max(sql_score, pdf_score):
+            return RouteResult(
+                route=QueryRoute.GREETING,
+                confidence=greeting_score,
+                reasoning=f"인사말로 분류 (유사도: {greeting_score:.3f})",
+                metadata=metadata
+            )
+        
+        # SQL과 PDF 중 선택
+        if sql_score > pdf_score and sql_score > 0.4:
+            return RouteResult(
+                route=QueryRoute.SQL_QUERY,
+                confidence=sql_score,
+                reasoning=f"SQL 쿼리로 분류 (SQL: {sql_score:.3f} vs PDF: {pdf_score:.3f})",
+                metadata=metadata
+            )
+        elif pdf_score > 0.4:
+            return RouteResult(
+                route=QueryRoute.PDF_SEARCH,
+                confidence=pdf_score,
+                reasoning=f"PDF 검색으로 분류 (PDF: {pdf_score:.3f} vs SQL: {sql_score:.3f})",
+                metadata=metadata
+            )
+        else:
+            # 둘 다 낮은 경우 기본값 (PDF 검색)
+            return RouteResult(
+                route=QueryRoute.PDF_SEARCH,
+                confidence=max(sql_score, pdf_score),
+                reasoning=f"기본 라우트 (PDF 검색) 선택",
+                metadata=metadata
+            )
     
     def _rule_based_routing(self, question: str) -> RouteResult:
         """
@@ -220,7 +437,7 @@ class QueryRouter:
         Returns:
             라우팅 결과
         """
-        question_lower = question.lower()
+        question_lower = question  # _normalize에서 이미 소문자화됨
         
         # 인사말 패턴
         greeting_patterns = ['안녕', '반갑', '하이', '처음', '도움']
@@ -281,16 +498,32 @@ class QueryRouter:
     
     def add_reference_question(self, route: QueryRoute, question: str):
         """참조 질문 추가"""
-        if route not in self.reference_questions:
-            self.reference_questions[route] = []
+        self.add_reference_questions(route, [question])
+    
+    def add_reference_questions(self, route: QueryRoute, questions: List[str]):
+        """참조 질문 여러 개 추가 (새 질문만 한 배치로 인코딩해 기존 행렬에 덧붙임)"""
+        if not questions:
+            return
         
-        self.reference_questions[route].append(question)
+        self.reference_questions.setdefault(route, []).extend(questions)
         
-        # 임베딩 다시 계산
         if self.embedding_model:
-            self._precompute_embeddings()
+            try:
+                new_embeddings = self._encode(questions, batch_size=len(questions))
+                existing = self.reference_embeddings.get(route)
+                self.reference_embeddings[route] = (
+                    new_embeddings if existing is None or not len(existing)
+                    else np.concatenate([existing, new_embeddings])
+                )
+                self._stack_reference_embeddings()
+            except Exception as e:
+                logger.error(f"참조 질문 임베딩 추가 실패: {e}")
+        
+        # 참조 질문이 바뀌었으므로 캐시된 라우팅 결과 무효화
+        with self._route_cache_lock:
+            self._route_cache.clear()
         
-        logger.info(f"참조 질문 추가: {route.value} - {question}")
+        logger.info(f"참조 질문 추가: {route.value} - {len(questions)}개")
     
     def get_route_statistics(self) -> Dict[str, int]:
         """라우트별 참조 질문 통계"""
@@ -5,6 +5,9 @@
 """
 
 import re
+import hashlib
+import threading
+from collections import OrderedDict
 from typing import List, Dict, Optional, Any
 from dataclasses import dataclass
 from datetime import datetime
@@ -15,6 +18,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# 질문 임베딩 LRU 캐시 크기
+EMBEDDING_CACHE_SIZE = 4096
+
 class QuestionType(Enum):
     """질문 유형 분류 (단순화)"""
     GREETING = "greeting"            # 인사말
@@ -56,6 +62,12 @@ class QuestionAnalyzer:
     
     def __init__(self, embedding_model: str = "jhgan/ko-sroberta-multitask"):
         """QuestionAnalyzer 초기화"""
+        self.embedding_model_name = embedding_model
+        
+        # 임베딩 LRU 캐시 (키: 모델명 + 질문의 SHA-256)
+        self._embedding_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._embedding_cache_lock = threading.Lock()
+        
         # 임베딩 모델 로드
         try:
             self.embedding_model = SentenceTransformer(embedding_model)
@@ -99,8 +111,9 @@ class QuestionAnalyzer:
         
         logger.info("질문 분석기 초기화 완료")
     
-    def analyze_question(self, question: str, use_conversation_context: bool = True) -> AnalyzedQuestion:
-        """질문 분석 (최적화)"""
+    def analyze_question(self, question: str, use_conversation_context: bool = True,
+                         embedding: Optional[np.ndarray] = None) -> AnalyzedQuestion:
+        """질문 분석 (최적화, embedding이 주어지면 임베딩 계산 생략)"""
         import time
         total_start_time = time.time()
         
@@ -143,10 +156,9 @@ class QuestionAnalyzer:
         
         # 8. 임베딩 생성 (가장 오래 걸릴 수 있는 부분)
         embedding_start = time.time()
-        embedding = None
-        if self.embedding_model:
+        if embedding is None and self.embedding_model:
             try:
-                embedding = self.embedding_model.encode([processed_question])[0]
+                embedding = self._encode_cached(processed_question)
             except Exception as e:
                 logger.warning(f"임베딩 생성 실패: {e}")
         embedding_time = time.time() - embedding_start
@@ -198,6 +210,54 @@ class QuestionAnalyzer:
         logger.info(f"질문 분석 완료: {question_type.value}, 키워드: {len(keywords)}개")
         return analyzed_question
     
+    def embed_batch(self, questions: List[str]) -> Optional[np.ndarray]:
+        """여러 질문을 한 번의 encode 호출로 임베딩 ((N, d) 행렬, 캐시된 질문은 재사용)"""
+        if not self.embedding_model or not questions:
+            return None
+        
+        texts = [self._preprocess_question(question) for question in questions]
+        keys = [hashlib.sha256(f"{self.embedding_model_name}\x00{text}".encode('utf-8')).digest()
+                for text in texts]
+        
+        embeddings: List[Optional[np.ndarray]] = [None] * len(texts)
+        with self._embedding_cache_lock:
+            for i, key in enumerate(keys):
+                embedding = self._embedding_cache.get(key)
+                if embedding is not None:
+                    self._embedding_cache.move_to_end(key)
+                    embeddings[i] = embedding
+        
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            encoded = self.embedding_model.encode([texts[i] for i in missing], batch_size=len(missing))
+            with self._embedding_cache_lock:
+                for i, embedding in zip(missing, encoded):
+                    embeddings[i] = embedding
+                    self._embedding_cache[keys[i]] = embedding
+                while len(self._embedding_cache) > EMBEDDING_CACHE_SIZE:
+                    self._embedding_cache.popitem(last=False)
+        
+        return np.vstack(embeddings)
+    
+    def _encode_cached(self, text: str) -> np.ndarray:
+        """동일한 질문은 임베딩 모델을 다시 호출하지 않도록 LRU 캐시 사용"""
+        key = hashlib.sha256(f"{self.embedding_model_name}\x00{text}".encode('utf-8')).digest()
+        
+        with self._embedding_cache_lock:
+            embedding = self._embedding_cache.get(key)
+            if embedding is not None:
+                self._embedding_cache.move_to_end(key)
+                return embedding
+        
+        embedding = self.embedding_model.encode([text])[0]
+        
+        with self._embedding_cache_lock:
+            self._embedding_cache[key] = embedding
+            if len(self._embedding_cache) > EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
+        
+        return embedding
+    
     def _preprocess_question(self, question: str) -> str:
         """질문 전처리"""
         # 기본 정규화
@@ -0,0 +1,85 @@
+"""
+유사도 계산 커널
+
+시맨틱 캐시의 (N, d) 임베딩 행렬과 쿼리 벡터의 내적을 계산합니다.
+행렬은 float32 또는 행별 스케일을 가진 int8 양자화 형식을 지원합니다.
+Numba가 설치되어 있으면 행 단위 병렬 JIT 커널을, 없으면 NumPy 행렬-벡터 곱을 사용합니다.
+"""
+
+import logging
+from typing import Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Numba (선택적)
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    logging.warning("Numba 라이브러리를 찾을 수 없습니다. NumPy 유사도 계산을 사용합니다.")
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _dot_scores(matrix, query):
+        n, dim = matrix.shape
+        out = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            total = np.float32(0.0)
+            for j in range(dim):
+                total += matrix[i, j] * query[j]
+            out[i] = total
+        return out
+    
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _dot_scores_int8(matrix, scales, query):
+        n, dim = matrix.shape
+        out = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            total = np.float32(0.0)
+            for j in range(dim):
+                total += np.float32(matrix[i, j]) * query[j]
+            out[i] = total * scales[i]
+        return out
+
+def quantize_int8(vector: np.ndarray):
+    """
+    float32 벡터를 int8로 대칭 양자화
+
+    Returns:
+        (int8 벡터, float32 스케일) - 원래 값 ≈ int8 벡터 * 스케일
+    """
+    max_abs = float(np.abs(vector).max()) if vector.size else 0.0
+    scale = max_abs / 127.0 if max_abs > 0 else 1.0
+    return np.round(vector / scale).astype(np.int8), np.float32(scale)
+
+def cosine_scores(matrix: np.ndarray, query: np.ndarray,
+                  scales: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    L2 정규화된 행렬의 각 행과 쿼리 벡터의 코사인 유사도
+
+    Args:
+        matrix: (N, d) float32 정규화 임베딩 행렬 또는 int8 양자화 행렬
+        query: (d,) float32 정규화 쿼리 벡터
+        scales: int8 행렬의 (N,) 행별 스케일 (float32 행렬이면 None)
+
+    Returns:
+        (N,) float32 유사도 배열
+    """
+    query = np.ascontiguousarray(query, dtype=np.float32)
+    if scales is not None:
+        if NUMBA_AVAILABLE:
+            return _dot_scores_int8(np.ascontiguousarray(matrix), np.ascontiguousarray(scales), query)
+        return (matrix @ query).astype(np.float32) * scales
+    if NUMBA_AVAILABLE:
+        return _dot_scores(np.ascontiguousarray(matrix), query)
+    return matrix @ query
+
+def warmup(dim: int = 768) -> None:
+    """첫 요청에서 JIT 컴파일 지연이 생기지 않도록 미리 컴파일"""
+    if NUMBA_AVAILABLE:
+        query = np.zeros(dim, dtype=np.float32)
+        cosine_scores(np.zeros((1, dim), dtype=np.float32), query)
+        cosine_scores(np.zeros((1, dim), dtype=np.int8), query, np.ones(1, dtype=np.float32))
+        logger.info("유사도 커널 JIT 컴파일 완료")
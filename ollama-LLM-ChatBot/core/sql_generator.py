@@ -55,14 +55,14 @@ class SQLModelType(Enum):
     SQLCODER_34B = "sqlcoder:34b"
     CUSTOM_SQL = "custom_sql"
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DatabaseSchema:
-    """데이터베이스 스키마 정보"""
+    """데이터베이스 스키마 정보 (불변, 스레드 간 공유 가능)"""
     table_name: str
-    columns: List[Dict[str, Any]]  # [{"name": "col1", "type": "TEXT", "description": "설명"}]
+    columns: Tuple[Dict[str, Any], ...]  # ({"name": "col1", "type": "TEXT", "description": "설명"},)
     primary_key: Optional[str] = None
-    foreign_keys: List[Dict[str, str]] = None  # [{"column": "col1", "references": "table.col"}]
-    sample_data: List[Dict[str, Any]] = None  # 샘플 데이터
+    foreign_keys: Optional[Tuple[Dict[str, str], ...]] = None  # ({"column": "col1", "references": "table.col"},)
+    sample_data: Optional[Tuple[Dict[str, Any], ...]] = None  # 샘플 데이터
 
 @dataclass
 class SQLQuery:
@@ -8,7 +8,8 @@
 import os
 import json
 import pickle
-from typing import List, Dict, Tuple, Optional, Any
+import threading
+from typing import List, Dict, Tuple, Optional, Any, Sequence, Union
 from dataclasses import asdict
 import numpy as np
 from abc import ABC, abstractmethod
@@ -16,7 +17,6 @@ from abc import ABC, abstractmethod
 import faiss
 import chromadb
 from chromadb.config import Settings
-from sklearn.metrics.pairwise import cosine_similarity
 
 from .pdf_processor import TextChunk
 
@@ -36,6 +36,11 @@ class VectorStoreInterface(ABC):
         """쿼리 임베딩과 유사한 청크들을 검색"""
         pass
     
+    @abstractmethod
+    def count(self) -> int:
+        """저장된 청크 수"""
+        pass
+    
     @abstractmethod
     def save(self, path: str) -> None:
         """저장소를 파일로 저장"""
@@ -75,6 +80,9 @@ class FAISSVectorStore(VectorStoreInterface):
         # 정규화를 위한 설정 (코사인 유사도 계산용)
         self.normalize_embeddings = True
         
+        # 인덱스와 self.chunks를 함께 보호 (추가/검색/저장/로드가 여러 스레드에서 실행됨)
+        self._lock = threading.RLock()
+        
         logger.info(f"FAISS 벡터 저장소 초기화 완료 (차원: {embedding_dimension})")
     
     def add_chunks(self, chunks: List[TextChunk]) -> None:
@@ -102,18 +110,21 @@ class FAISSVectorStore(VectorStoreInterface):
             
             embeddings.append(embedding)
         
-        # FAISS 인덱스에 추가
         embeddings_matrix = np.array(embeddings).astype('float32')
-        self.index.add(embeddings_matrix)
-        
-        # 메타데이터 저장
-        self.chunks.extend(chunks)
+        chunk_metadata = []
         for chunk in chunks:
             metadata = asdict(chunk)
             metadata.pop('embedding', None)  # 임베딩은 별도 저장
-            self.chunk_metadata.append(metadata)
+            chunk_metadata.append(metadata)
         
-        logger.info(f"{len(chunks)}개 청크를 FAISS 인덱스에 추가 (총 {len(self.chunks)}개)")
+        # FAISS 인덱스와 메타데이터를 한 번에 갱신 (검색이 인덱스/청크 불일치를 보지 않도록)
+        with self._lock:
+            self.index.add(embeddings_matrix)
+            self.chunks.extend(chunks)
+            self.chunk_metadata.extend(chunk_metadata)
+            total = len(self.chunks)
+        
+        logger.info(f"{len(chunks)}개 청크를 FAISS 인덱스에 추가 (총 {total}개)")
     
     def search(self, query_embedding: np.ndarray, top_k: int = 5, 
                use_hybrid_search: bool = True) -> List[Tuple[TextChunk, float]]:
@@ -131,38 +142,85 @@ class FAISSVectorStore(VectorStoreInterface):
         import time
         search_start = time.time()
         
-        if len(self.chunks) == 0:
-            return []
+        with self._lock:
+            if len(self.chunks) == 0:
+                return []
         
-        # 1. 벡터 유사도 검색
-        vector_start = time.time()
-        if self.normalize_embeddings:
-            query_embedding = query_embedding / np.linalg.norm(query_embedding)
+            # 1. 벡터 유사도 검색
+            vector_start = time.time()
+            if self.normalize_embeddings:
+                query_embedding = query_embedding / np.linalg.norm(query_embedding)
         
-        # FAISS 검색
-        scores, indices = self.index.search(
-            query_embedding.reshape(1, -1), 
-            min(top_k * 2, len(self.chunks))  # 더 많은 후보 검색
-        )
-        vector_time = time.time() - vector_start
+            # FAISS 검색
+            scores, indices = self.index.search(
+                query_embedding.reshape(1, -1), 
+                min(top_k * 2, len(self.chunks))  # 더 많은 후보 검색
+            )
+            vector_time = time.time() - vector_start
         
-        # 2. 하이브리드 검색 (키워드 매칭 + 벡터 유사도)
-        hybrid_start = time.time()
-        if use_hybrid_search:
-            results = self._hybrid_search(query_embedding, scores[0], indices[0], top_k)
-        else:
-            results = [(self.chunks[i], float(s)) for s, i in zip(scores[0], indices[0])]
-        hybrid_time = time.time() - hybrid_start
+            # 2. 하이브리드 검색 (키워드 매칭 + 벡터 유사도)
+            hybrid_start = time.time()
+            if use_hybrid_search:
+                results = self._hybrid_search(query_embedding, scores[0], indices[0], top_k)
+            else:
+                results = [(self.chunks[i], float(s)) for s, i in zip(scores[0], indices[0])]
+            hybrid_time = time.time() - hybrid_start
+        
+            # 3. 결과 필터링 및 정렬
+            filter_start = time.time()
+            filtered_results = self._filter_and_rank_results(results, top_k)
+            filter_time = time.time() - filter_start
+        
+            total_time = time.time() - search_start
+            print(f"    📊 FAISS 검색 세부: 벡터({vector_time:.3f}s) | 하이브리드({hybrid_time:.3f}s) | 필터({filter_time:.3f}s) | 총({total_time:.3f}s)")
+        
+            return filtered_results[:top_k]
+    
+    def search_batch(self, query_embeddings: np.ndarray, top_k: Union[int, Sequence[int]] = 5,
+                     use_hybrid_search: bool = True) -> List[List[Tuple[TextChunk, float]]]:
+        """
+        여러 쿼리를 한 번의 FAISS 호출로 검색
+        
+        FAISS는 가장 큰 top_k 기준으로 한 번 검색하고, 쿼리별로는 자신의 top_k * 2개 후보만
+        재랭킹하므로 결과가 같은 배치의 다른 쿼리에 영향받지 않음 (단건 search와 동일)
+        
+        Args:
+            query_embeddings: (N, d) 쿼리 임베딩 행렬
+            top_k: 쿼리당 반환할 최대 결과 수 (정수 하나 또는 쿼리별 목록)
+            use_hybrid_search: 하이브리드 검색 사용 여부
+            
+        Returns:
+            쿼리별 (TextChunk, 유사도 점수) 튜플 리스트
+        """
+        queries = np.asarray(query_embeddings, dtype=np.float32).reshape(len(query_embeddings), -1)
+        top_ks = [top_k] * len(queries) if isinstance(top_k, int) else list(top_k)
+        with self._lock:
+            if len(self.chunks) == 0:
+                return [[] for _ in range(len(queries))]
+        
+            if self.normalize_embeddings:
+                norms = np.linalg.norm(queries, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                queries = queries / norms
         
-        # 3. 결과 필터링 및 정렬
-        filter_start = time.time()
-        filtered_results = self._filter_and_rank_results(results, top_k)
-        filter_time = time.time() - filter_start
+            scores, indices = self.index.search(queries, min(max(top_ks) * 2, len(self.chunks)))
         
-        total_time = time.time() - search_start
-        print(f"    📊 FAISS 검색 세부: 벡터({vector_time:.3f}s) | 하이브리드({hybrid_time:.3f}s) | 필터({filter_time:.3f}s) | 총({total_time:.3f}s)")
+            batch_results = []
+            for query, row_scores, row_indices, row_k in zip(queries, scores, indices, top_ks):
+                # 단건 search와 같은 후보 수로 제한
+                n_candidates = min(row_k * 2, len(self.chunks))
+                row_scores, row_indices = row_scores[:n_candidates], row_indices[:n_candidates]
+                if use_hybrid_search:
+                    results = self._hybrid_search(query, row_scores, row_indices, row_k)
+                else:
+                    results = [(self.chunks[i], float(s)) for s, i in zip(row_scores, row_indices)]
+                batch_results.append(self._filter_and_rank_results(results, row_k)[:row_k])
         
-        return filtered_results[:top_k]
+            return batch_results
+    
+    def count(self) -> int:
+        """저장된 청크 수 (FAISS 인덱스 크기, O(1))"""
+        return self.index.ntotal
     
     def _hybrid_search(self, query_embedding: np.ndarray, 
                       vector_scores: np.ndarray, 
@@ -317,17 +375,36 @@ class FAISSVectorStore(VectorStoreInterface):
         """
         os.makedirs(path, exist_ok=True)
         
-        # FAISS 인덱스 저장
-        faiss.write_index(self.index, os.path.join(path, "faiss_index.bin"))
+        with self._lock:
+            # FAISS 인덱스 저장 (저장 중 추가가 끼어들지 않도록 락 안에서 인덱스/청크를 함께 기록)
+            faiss.write_index(self.index, os.path.join(path, "faiss_index.bin"))
+            chunks = list(self.chunks)
         
-        # 청크 메타데이터 저장
-        with open(os.path.join(path, "chunks.pkl"), "wb") as f:
-            pickle.dump(self.chunks, f)
+        # 청크 임베딩은 하나의 float32 행렬(.npy)로, 나머지 필드는 JSON으로 저장
+        rows = []
+        chunk_records = []
+        for chunk in chunks:
+            embedding_row = None
+            if chunk.embedding is not None:
+                embedding_row = len(rows)
+                rows.append(chunk.embedding)
+            chunk_records.append({
+                "content": chunk.content,
+                "page_number": chunk.page_number,
+                "chunk_id": chunk.chunk_id,
+                "metadata": chunk.metadata,
+                "embedding_row": embedding_row
+            })
+        embeddings = (np.asarray(rows, dtype=np.float32) if rows
+                      else np.empty((0, self.embedding_dimension), dtype=np.float32))
+        np.save(os.path.join(path, "chunk_embeddings.npy"), embeddings)
+        with open(os.path.join(path, "chunks.json"), "w", encoding="utf-8") as f:
+            json.dump(chunk_records, f, ensure_ascii=False)
         
         # 추가 메타데이터 저장
         metadata = {
             "embedding_dimension": self.embedding_dimension,
-            "total_chunks": len(self.chunks),
+            "total_chunks": len(chunks),
             "normalize_embeddings": self.normalize_embeddings
         }
         with open(os.path.join(path, "metadata.json"), "w", encoding="utf-8") as f:
@@ -346,17 +423,38 @@ class FAISSVectorStore(VectorStoreInterface):
         with open(os.path.join(path, "metadata.json"), "r", encoding="utf-8") as f:
             metadata = json.load(f)
         
-        self.embedding_dimension = metadata["embedding_dimension"]
-        self.normalize_embeddings = metadata.get("normalize_embeddings", True)
-        
         # FAISS 인덱스 로드
-        self.index = faiss.read_index(os.path.join(path, "faiss_index.bin"))
+        index = faiss.read_index(os.path.join(path, "faiss_index.bin"))
+        
+        # 청크 데이터 로드 (이전 형식인 chunks.pkl도 지원)
+        chunks_path = os.path.join(path, "chunks.json")
+        if os.path.exists(chunks_path):
+            embeddings = np.load(os.path.join(path, "chunk_embeddings.npy"))
+            with open(chunks_path, "r", encoding="utf-8") as f:
+                chunk_records = json.load(f)
+            chunks = [
+                TextChunk(
+                    content=record["content"],
+                    page_number=record["page_number"],
+                    chunk_id=record["chunk_id"],
+                    embedding=(embeddings[record["embedding_row"]]
+                               if record["embedding_row"] is not None else None),
+                    metadata=record["metadata"]
+                )
+                for record in chunk_records
+            ]
+        else:
+            with open(os.path.join(path, "chunks.pkl"), "rb") as f:
+                chunks = pickle.load(f)
         
-        # 청크 데이터 로드
-        with open(os.path.join(path, "chunks.pkl"), "rb") as f:
-            self.chunks = pickle.load(f)
+        # 인덱스와 청크 목록을 한 번에 교체
+        with self._lock:
+            self.embedding_dimension = metadata["embedding_dimension"]
+            self.normalize_embeddings = metadata.get("normalize_embeddings", True)
+            self.index = index
+            self.chunks = chunks
         
-        logger.info(f"FAISS 벡터 저장소를 {path}에서 로드 완료 ({len(self.chunks)}개 청크)")
+        logger.info(f"FAISS 벡터 저장소를 {path}에서 로드 완료 ({len(chunks)}개 청크)")
 
 class ChromaDBVectorStore(VectorStoreInterface):
     """
@@ -509,6 +607,10 @@ class ChromaDBVectorStore(VectorStoreInterface):
         
         return chunks_with_scores
     
+    def count(self) -> int:
+        """저장된 청크 수"""
+        return self.collection.count()
+    
     def save(self, path: str) -> None:
         """ChromaDB는 자동으로 지속성 관리"""
         logger.info("ChromaDB는 자동으로 데이터를 지속적으로 저장합니다.")
@@ -716,6 +818,10 @@ class HybridVectorStore:
         self.faiss_store.add_chunks(chunks)
         self.chroma_store.add_chunks(chunks)
     
+    def count(self) -> int:
+        """검색에 사용되는 FAISS 저장소의 청크 수"""
+        return self.faiss_store.count()
+    
     def search(self, query_embedding: np.ndarray, top_k: int = 5,
                use_metadata_filter: bool = False,
                filter_metadata: Optional[Dict] = None,
@@ -750,6 +856,13 @@ class HybridVectorStore:
         
         return filtered_result
     
+    def search_batch(self, query_embeddings: np.ndarray, top_k: Union[int, Sequence[int]] = 5,
+                     similarity_threshold: float = 0.1) -> List[List[Tuple[TextChunk, float]]]:
+        """여러 쿼리를 FAISS로 일괄 검색 (쿼리별 유사도 임계값 필터링)"""
+        batch_results = self.faiss_store.search_batch(query_embeddings, top_k)
+        return [[(chunk, score) for chunk, score in result if score >= similarity_threshold]
+                for result in batch_results]
+    
     def save(self, path: Optional[str] = None) -> None:
         """두 저장소 모두 저장"""
         save_path = path or "./vector_store"
@@ -762,16 +875,24 @@ class HybridVectorStore:
         
         logger.info(f"하이브리드 벡터 저장소 저장 완료: {save_path}")
     
-    def load(self, path: Optional[str] = None) -> None:
-        """저장된 데이터 로드"""
+    def load(self, path: Optional[str] = None) -> bool:
+        """
+        저장된 데이터 로드
+        
+        Returns:
+            FAISS 스냅샷을 실제로 로드했으면 True (스냅샷이 없으면 False)
+        """
         load_path = path or "./vector_store"
         
         faiss_path = os.path.join(load_path, "faiss")
-        if os.path.exists(faiss_path):
-            self.faiss_store.load(faiss_path)
+        if not os.path.exists(faiss_path):
+            logger.warning(f"FAISS 스냅샷이 없습니다: {faiss_path}")
+            return False
+        self.faiss_store.load(faiss_path)
         
         # ChromaDB는 자동 로드
         logger.info(f"하이브리드 벡터 저장소 로드 완료: {load_path}")
+        return True
 
 # 유틸리티 함수들
 def calculate_retrieval_metrics(relevant_chunks: List[str], 
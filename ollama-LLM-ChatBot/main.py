@@ -21,7 +21,7 @@ sys.path.append(str(Path(__file__).parent))
 from core.pdf_processor import PDFProcessor
 from core.vector_store import HybridVectorStore
 from core.question_analyzer import QuestionAnalyzer
-from core.answer_generator import AnswerGenerator, ModelType, GenerationConfig
+from core.answer_generator import AnswerGenerator, ModelType, GenerationConfig, DEFAULT_MODEL_NAME
 from core.sql_generator import SQLGenerator, DatabaseSchema
 from core.query_router import QueryRouter
 from core.sql_element_extractor import SQLElementExtractor
@@ -51,7 +51,7 @@ class PDFQASystem:
     
     def __init__(self, 
                  model_type: str = "ollama",
-                 model_name: str = "qwen2:1.5b",
+                 model_name: str = DEFAULT_MODEL_NAME,
                  embedding_model: str = "jhgan/ko-sroberta-multitask"):
         """
         시스템 초기화
@@ -735,7 +735,7 @@ def main():
     parser.add_argument("--question", type=str, help="질문 (process 모드)")
     parser.add_argument("--model-type", choices=["ollama", "huggingface", "llama_cpp"],
                        default="ollama", help="사용할 모델 타입")
-    parser.add_argument("--model-name", type=str, default="qwen2:1.5b", 
+    parser.add_argument("--model-name", type=str, default=DEFAULT_MODEL_NAME, 
                        help="모델 이름")
     parser.add_argument("--embedding-model", type=str, 
                        default="jhgan/ko-sroberta-multitask",
@@ -766,7 +766,7 @@ def main():
             logger.info("- 문서 검색 파이프라인: PDF 내용 기반 질문 답변")
             logger.info("- SQL 질의 파이프라인: 데이터베이스 스키마 기반 SQL 생성")
             logger.info("- 하이브리드 파이프라인: 두 파이프라인 결과 통합")
-            uvicorn.run(app, host=args.host, port=args.port)
+            uvicorn.run(app, host=args.host, port=args.port, loop="uvloop", http="httptools")
             
         elif args.mode == "process":
             if not args.pdf or not args.question:
@@ -16,8 +16,6 @@ from pathlib import Path
 # 프로젝트 루트 디렉토리를 Python 경로에 추가
 sys.path.append(str(Path(__file__).parent))
 
-from api.endpoints import app, initialize_system
-
 # 로깅 설정
 logging.basicConfig(
     level=logging.INFO,
@@ -119,7 +117,7 @@ def main():
     
     # 환경 변수에서 설정 가져오기
     model_type = os.getenv("MODEL_TYPE", "ollama")
-    model_name = os.getenv("MODEL_NAME", "qwen2:1.5b")
+    model_name = os.getenv("ANS_GEN_MODEL", os.getenv("MODEL_NAME", "qwen2:1.5b-instruct-q4_K_M"))
     embedding_model = os.getenv("EMBEDDING_MODEL", "jhgan/ko-sroberta-multitask")
     
     # Ollama 모델 자동 다운로드
@@ -141,14 +139,31 @@ def main():
     try:
         logger.info("시스템 초기화 및 자동 PDF 업로드 시작...")
         
+        # PDF 추출 작업자(spawn)가 __main__을 다시 import할 때 무거운 API 모듈을
+        # 로드하지 않도록 main() 안에서 import
+        from api.endpoints import app, initialize_system, API_WORKERS
+        
         # 시스템 초기화 (PDF 자동 업로드 포함)
-        initialize_system()
+        if API_WORKERS > 1:
+            # 멀티 워커 모드: 부모는 워커를 띄운 뒤 요청을 처리하지 않으므로 모델을 들고 있지 않도록
+            # 별도 프로세스에서 PDF를 처리해 스냅샷만 저장하고 종료 (각 워커가 시작 시 스냅샷 로드)
+            import multiprocessing
+            init_process = multiprocessing.get_context("spawn").Process(target=initialize_system)
+            init_process.start()
+            init_process.join()
+        else:
+            initialize_system()
         
         logger.info("API 서버를 시작합니다...")
         
         # FastAPI 서버 실행
         import uvicorn
-        uvicorn.run(app, host="0.0.0.0", port=8008)
+        if API_WORKERS > 1:
+            # 워커별 프로세스로 GIL 우회 (워커는 import 문자열로 앱을 새로 로드, 벡터 저장소는 워커별 사본)
+            uvicorn.run("api.endpoints:app", host="0.0.0.0", port=8008, workers=API_WORKERS,
+                        loop="uvloop", http="httptools")
+        else:
+            uvicorn.run(app, host="0.0.0.0", port=8008, loop="uvloop", http="httptools")
         
     except KeyboardInterrupt:
         logger.info("서버가 중단되었습니다.")
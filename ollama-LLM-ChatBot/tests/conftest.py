@@ -0,0 +1,11 @@
+"""
+pytest 공통 설정
+
+프로젝트 루트를 import 경로에 추가해 `core`, `api` 패키지를 바로 import할 수 있게 합니다.
+(main.py / run_server.py와 같은 방식)
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,59 @@
+"""
+AnswerGenerator._build_context 테스트 (누적 길이 기준 청크 선택을 이전 반복문 구현과 비교)
+"""
+
+import pytest
+
+from core.answer_generator import AnswerGenerator
+from core.pdf_processor import TextChunk
+
+def _reference_context(relevant_chunks, max_context_length):
+    """searchsorted 도입 전의 break-on-overflow 반복문 구현"""
+    context_parts = []
+    current_length = 0
+
+    for chunk, similarity in relevant_chunks:
+        chunk_text = chunk.content.strip()
+        if current_length + len(chunk_text) > max_context_length:
+            break
+
+        context_parts.append(f"[유사도: {similarity:.2f}] {chunk_text}")
+        current_length += len(chunk_text)
+
+    return "\n\n".join(context_parts)
+
+def _chunks(lengths):
+    return [
+        (TextChunk(content=f"  {'가' * length}\n", page_number=1, chunk_id=f"chunk_{i}"), 0.9 - i * 0.013)
+        for i, length in enumerate(lengths)
+    ]
+
+@pytest.fixture
+def generator():
+    return AnswerGenerator(cache_enabled=False)
+
+@pytest.mark.parametrize("lengths", [
+    [100, 200, 300],
+    [500, 10, 10],
+    [1000, 1],
+    [0, 0, 1000, 1],
+    [333] * 10,
+])
+@pytest.mark.parametrize("max_context_length", [0, 99, 100, 300, 600, 1000, 5000])
+def test_build_context_matches_loop(generator, lengths, max_context_length):
+    relevant_chunks = _chunks(lengths)
+
+    context = generator._build_context(relevant_chunks, max_context_length)
+
+    assert context == _reference_context(relevant_chunks, max_context_length)
+
+def test_build_context_reuses_cached_string(generator):
+    relevant_chunks = _chunks([100, 200])
+
+    first = generator._build_context(relevant_chunks, 1000)
+
+    assert generator._build_context(relevant_chunks, 1000) is first
+    assert generator._build_context(relevant_chunks, 150) == _reference_context(relevant_chunks, 150)
+
+def test_build_context_empty(generator):
+    assert generator._build_context([]) == "관련 정보를 찾을 수 없습니다."
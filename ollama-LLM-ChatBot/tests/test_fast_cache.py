@@ -0,0 +1,160 @@
+"""
+FastCache / SemanticCache 동작 테스트
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from core.fast_cache import FastCache, SemanticCache
+
+DIM = 32
+
+def _unit(index, dim=DIM):
+    """index 축 방향 단위 벡터"""
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[index] = 1.0
+    return vector
+
+def _rotated(cosine, dim=DIM):
+    """_unit(0)과의 코사인 유사도가 cosine인 단위 벡터"""
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[0] = cosine
+    vector[1] = np.sqrt(1.0 - cosine ** 2)
+    return vector
+
+@pytest.fixture
+def fast_cache():
+    cache = FastCache(max_size=3, default_ttl=60, sweep_interval=3600)
+    yield cache
+    cache.stop()
+
+# ---------------------------------------------------------------------------
+# FastCache
+# ---------------------------------------------------------------------------
+
+def test_fast_cache_evicts_least_recently_used(fast_cache):
+    for query in ("a", "b", "c"):
+        fast_cache.put(query, query.upper())
+
+    # 조회한 항목은 최근 사용으로 이동하므로 b가 가장 오래된 항목이 됨
+    assert fast_cache.get("a") == "A"
+    fast_cache.put("d", "D")
+
+    assert fast_cache.get("b") is None
+    assert [fast_cache.get(query) for query in ("a", "c", "d")] == ["A", "C", "D"]
+    assert list(fast_cache.cache) == [fast_cache._generate_key(query) for query in ("a", "c", "d")]
+
+def test_fast_cache_update_moves_key_without_eviction(fast_cache):
+    for query in ("a", "b", "c"):
+        fast_cache.put(query, query.upper())
+
+    fast_cache.put("a", "A2")
+    fast_cache.put("d", "D")
+
+    assert fast_cache.get("a") == "A2"
+    assert fast_cache.get("b") is None
+    assert len(fast_cache.cache) == 3
+
+def test_fast_cache_expired_item_is_miss(fast_cache):
+    fast_cache.put("a", "A", ttl=0.01)
+    time.sleep(0.05)
+
+    assert fast_cache.get("a") is None
+    assert fast_cache.get_stats()["misses"] == 1
+
+def test_fast_cache_disk_is_created_lazily_and_reopened(tmp_path):
+    pytest.importorskip("diskcache")
+    persist_dir = tmp_path / "question"
+
+    cache = FastCache(max_size=3, default_ttl=60, sweep_interval=3600, persist_dir=str(persist_dir))
+    # 생성만으로는 디렉토리를 만들지 않음
+    assert cache._disk is None
+    assert not persist_dir.exists()
+
+    cache.put("q", {"answer": "A"}, context="ctx")
+    assert persist_dir.exists()
+    cache.stop()
+    cache._disk.close()
+
+    # 재시작: 새 인스턴스는 첫 조회 때 같은 디렉토리를 다시 열어 메모리에 적재
+    reopened = FastCache(max_size=3, default_ttl=60, sweep_interval=3600, persist_dir=str(persist_dir))
+    try:
+        assert reopened._disk is None
+        assert reopened.get("q", "ctx") == {"answer": "A"}
+        assert reopened._disk is not None
+        assert len(reopened.cache) == 1
+        assert reopened.get("q", "other") is None
+
+        stats = reopened.get_stats()
+        assert stats["persistent"] is True
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+    finally:
+        reopened.stop()
+        reopened._disk.close()
+
+# ---------------------------------------------------------------------------
+# SemanticCache
+# ---------------------------------------------------------------------------
+
+def test_semantic_cache_threshold_hit_and_miss():
+    cache = SemanticCache(max_size=10, similarity_threshold=0.92)
+    cache.put(_unit(0), "A")
+
+    assert cache.get(_rotated(0.97)) == "A"
+    assert cache.get(_rotated(0.85)) is None
+    # 호출별 임계값이 기본값보다 우선
+    assert cache.get(_rotated(0.85), threshold=0.8) == "A"
+    # 정규화되지 않은 임베딩도 방향만 비교
+    assert cache.get(_unit(0) * 5.0) == "A"
+    assert (cache.hits, cache.misses) == (3, 1)
+
+def test_semantic_cache_requires_matching_context():
+    cache = SemanticCache(max_size=10)
+    cache.put(_unit(0), "A", context="doc-1")
+
+    assert cache.get(_unit(0), context="doc-2") is None
+    assert cache.get(_unit(0), context="doc-1") == "A"
+
+def test_semantic_cache_skips_and_purges_expired_entries():
+    cache = SemanticCache(max_size=10)
+    cache.put(_unit(0), "old", ttl=0.01)
+    cache.put(_unit(1), "fresh")
+    time.sleep(0.05)
+
+    assert cache.get(_unit(0)) is None
+    assert cache.get(_unit(1)) == "fresh"
+
+    # 다음 저장 시 만료 항목이 제거되고 남은 항목은 그대로 조회됨
+    cache.put(_unit(2), "new")
+    assert cache.size == 2
+    assert cache.get(_unit(1)) == "fresh"
+    assert cache.get(_unit(2)) == "new"
+
+def test_semantic_cache_evicts_least_recently_used():
+    cache = SemanticCache(max_size=3)
+    cache.put_many([(_unit(i), f"v{i}", "") for i in range(3)])
+
+    # v0을 조회해 최근 사용으로 이동 -> v1이 가장 오래된 항목
+    assert cache.get(_unit(0)) == "v0"
+    cache.put(_unit(3), "v3")
+
+    assert cache.size == 3
+    assert cache.get(_unit(1)) is None
+    # 슬롯 이동(swap-remove) 후에도 각 임베딩이 자기 데이터를 반환
+    assert [cache.get(_unit(i)) for i in (0, 2, 3)] == ["v0", "v2", "v3"]
+
+    # 한 번의 put_many가 max_size를 넘겨도 가장 오래된 항목부터 제거
+    cache.put_many([(_unit(i), f"v{i}", "") for i in (4, 5)])
+    assert cache.get(_unit(0)) is None
+    assert [cache.get(_unit(i)) for i in (3, 4, 5)] == ["v3", "v4", "v5"]
+
+def test_semantic_cache_dimension_change_resets_entries():
+    cache = SemanticCache(max_size=3)
+    cache.put(_unit(0), "A")
+    cache.put(_unit(0, dim=DIM * 2), "B")
+
+    assert cache.size == 1
+    assert cache.get(_unit(0)) is None
+    assert cache.get(_unit(0, dim=DIM * 2)) == "B"
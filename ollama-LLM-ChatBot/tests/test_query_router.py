@@ -0,0 +1,81 @@
+"""
+QueryRouter.route_batch 테스트 (단건 route_query 결과와 비교)
+
+실제 SBERT 모델 대신 문자 bigram 해시 임베딩을 내는 가짜 모델을 사용해
+네트워크/모델 다운로드 없이 행렬 기반 배치 라우팅 경로를 검증합니다.
+"""
+
+import zlib
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from core import query_router
+from core.query_router import QueryRoute, QueryRouter
+
+DIM = 256
+
+class HashingEncoder:
+    """SentenceTransformer.encode와 같은 인터페이스의 결정적 가짜 인코더"""
+
+    device = SimpleNamespace(type="cpu")
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def encode(self, texts, normalize_embeddings=False, **kwargs):
+        embeddings = np.zeros((len(texts), DIM), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for a, b in zip(text, text[1:]):
+                embeddings[row, zlib.crc32(f"{a}{b}".encode("utf-8")) % DIM] += 1.0
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.where(norms > 0, norms, 1.0)
+        return embeddings
+
+QUESTIONS = [
+    "교차로가 몇 개인가요?",
+    "강남구  교차로 개수는?",
+    "IFRO 시스템이란?",
+    "설치 방법 알려주세요",
+    "안녕하세요",
+    "안녕하세요 ",
+    "날씨",
+    "교차로가 몇 개인가요?",
+]
+
+@pytest.fixture
+def make_router(monkeypatch, tmp_path):
+    monkeypatch.setattr(query_router, "SBERT_AVAILABLE", True)
+    monkeypatch.setattr(query_router, "SentenceTransformer", HashingEncoder, raising=False)
+    monkeypatch.setattr(query_router, "ROUTER_CACHE_DIR", str(tmp_path))
+    return lambda: QueryRouter(embedding_model="hashing-test")
+
+def test_route_batch_matches_route_query(make_router):
+    batch_router = make_router()
+    assert batch_router._ref_matrix is not None
+
+    batch = batch_router.route_batch(QUESTIONS)
+
+    # 질문마다 새 라우터로 단건 라우팅 (라우팅 캐시 영향 제거)
+    for question, result in zip(QUESTIONS, batch):
+        expected = make_router().route_query(question)
+        assert result.route == expected.route
+        assert result.confidence == pytest.approx(expected.confidence, abs=1e-5)
+        assert result.reasoning == expected.reasoning
+
+def test_route_batch_covers_all_routes(make_router):
+    routes = {result.route for result in make_router().route_batch(QUESTIONS)}
+
+    assert {QueryRoute.SQL_QUERY, QueryRoute.PDF_SEARCH, QueryRoute.GREETING} <= routes
+
+def test_route_batch_reuses_results_for_duplicates(make_router):
+    router = make_router()
+    results = router.route_batch(QUESTIONS)
+
+    # 공백/중복만 다른 질문은 같은 결과 객체를 공유하고 캐시에 한 번만 저장됨
+    assert results[0] is results[7]
+    assert results[4] is results[5]
+    assert len(router._route_cache) == len(QUESTIONS) - 2
+    assert router.route_query("교차로가   몇 개인가요?") is results[0]
@@ -0,0 +1,73 @@
+"""
+sim_kernel 유사도 커널 테스트 (NumPy 행렬-벡터 곱 기준값과 비교)
+"""
+
+import numpy as np
+import pytest
+
+from core import sim_kernel
+from core.sim_kernel import cosine_scores, quantize_int8
+
+DIM = 64
+
+def _normalized(rng, shape):
+    """L2 정규화된 float32 난수 벡터/행렬"""
+    values = rng.standard_normal(shape).astype(np.float32)
+    return values / np.linalg.norm(values, axis=-1, keepdims=True)
+
+def _quantize_rows(matrix):
+    """행별 int8 양자화 (SemanticCache 저장 형식)"""
+    rows = [quantize_int8(row) for row in matrix]
+    return np.stack([q for q, _ in rows]), np.array([s for _, s in rows], dtype=np.float32)
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+def test_quantize_int8_round_trip(rng):
+    vector = _normalized(rng, DIM)
+    quantized, scale = quantize_int8(vector)
+
+    assert quantized.dtype == np.int8
+    assert np.abs(quantized).max() == 127
+    np.testing.assert_allclose(quantized * scale, vector, atol=scale / 2 + 1e-7)
+
+def test_quantize_int8_zero_vector():
+    quantized, scale = quantize_int8(np.zeros(DIM, dtype=np.float32))
+
+    assert scale == 1.0
+    assert not quantized.any()
+
+def test_cosine_scores_float32_matches_numpy(rng):
+    matrix = _normalized(rng, (50, DIM))
+    query = _normalized(rng, DIM)
+
+    scores = cosine_scores(matrix, query)
+
+    assert scores.shape == (50,)
+    np.testing.assert_allclose(scores, matrix @ query, rtol=1e-5, atol=1e-6)
+
+def test_cosine_scores_int8_matches_dequantized_numpy(rng):
+    matrix = _normalized(rng, (50, DIM))
+    query = _normalized(rng, DIM)
+    quantized, scales = _quantize_rows(matrix)
+
+    scores = cosine_scores(quantized, query, scales)
+
+    expected = (quantized.astype(np.float32) * scales[:, None]) @ query
+    assert scores.dtype == np.float32
+    np.testing.assert_allclose(scores, expected, rtol=1e-5, atol=1e-6)
+    # 양자화 오차는 임계값(0.92) 판단에 영향이 없을 만큼 작아야 함
+    np.testing.assert_allclose(scores, matrix @ query, atol=0.01)
+
+@pytest.mark.skipif(not sim_kernel.NUMBA_AVAILABLE, reason="numba 미설치")
+def test_numba_kernels_match_numpy(rng):
+    matrix = _normalized(rng, (50, DIM))
+    query = _normalized(rng, DIM)
+    quantized, scales = _quantize_rows(matrix)
+
+    np.testing.assert_allclose(sim_kernel._dot_scores(matrix, query), matrix @ query,
+                               rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(sim_kernel._dot_scores_int8(quantized, scales, query),
+                               (quantized.astype(np.float32) * scales[:, None]) @ query,
+                               rtol=1e-5, atol=1e-6)
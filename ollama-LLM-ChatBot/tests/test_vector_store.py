@@ -0,0 +1,91 @@
+"""
+FAISSVectorStore.search_batch 테스트 (쿼리별 단건 search 결과와 비교)
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faiss")
+
+from core.pdf_processor import TextChunk
+from core.vector_store import FAISSVectorStore
+
+DIM = 16
+
+# 하이브리드 점수의 키워드 가중치가 순위에 영향을 주도록 일부 청크에만 키워드 포함
+KEYWORDS = ["교차로 분석", "시스템 설정", "데이터 백업", "지도 마커 선택"]
+
+@pytest.fixture(scope="module")
+def store():
+    rng = np.random.default_rng(0)
+    store = FAISSVectorStore(embedding_dimension=DIM)
+    store.add_chunks([
+        TextChunk(
+            content=f"청크 {i} 본문 {KEYWORDS[i % len(KEYWORDS)] if i % 3 == 0 else ''} 내용 {i * 7}",
+            page_number=i // 5 + 1,
+            chunk_id=f"chunk_{i}",
+            embedding=rng.standard_normal(DIM).astype(np.float32),
+        )
+        for i in range(40)
+    ])
+    return store
+
+@pytest.fixture(scope="module")
+def queries(store):
+    # 저장된 청크 근처의 쿼리 (점수 임계값 0.1 필터를 통과하는 후보가 충분하도록)
+    rng = np.random.default_rng(1)
+    base = np.stack([store.chunks[i].embedding for i in (0, 7, 13, 26, 39)])
+    return base + 0.5 * rng.standard_normal(base.shape).astype(np.float32)
+
+def _summary(results):
+    return [(chunk.chunk_id, round(score, 5)) for chunk, score in results]
+
+@pytest.mark.parametrize("use_hybrid_search", [True, False])
+def test_search_batch_matches_search(store, queries, use_hybrid_search):
+    batch = store.search_batch(queries, top_k=5, use_hybrid_search=use_hybrid_search)
+
+    assert len(batch) == len(queries)
+    for query, results in zip(queries, batch):
+        expected = store.search(query, top_k=5, use_hybrid_search=use_hybrid_search)
+        assert expected
+        assert _summary(results) == _summary(expected)
+
+def test_search_batch_per_query_top_k_matches_search(store, queries):
+    # 가장 큰 top_k로 한 번 검색하더라도 쿼리별로는 자기 top_k 기준 후보만 재랭킹해야 함
+    top_ks = [1, 8, 3, 12, 2]
+
+    batch = store.search_batch(queries, top_k=top_ks)
+
+    for query, k, results in zip(queries, top_ks, batch):
+        assert len(results) <= k
+        assert _summary(results) == _summary(store.search(query, top_k=k))
+
+def test_search_batch_small_top_k_ignores_candidates_of_larger_top_k():
+    # 벡터 유사도 3위인 키워드 청크는 top_k=1(후보 2개)에서는 재랭킹 대상이 아니지만
+    # 후보를 더 받으면 하이브리드 점수로 1위가 됨 -> 같은 배치의 top_k=3 쿼리에 영향받으면 안 됨
+    def embedding(cosine, axis):
+        vector = np.zeros(DIM, dtype=np.float32)
+        vector[0], vector[axis] = cosine, np.sqrt(1.0 - cosine ** 2)
+        return vector
+
+    store = FAISSVectorStore(embedding_dimension=DIM)
+    store.add_chunks([
+        TextChunk(content="첫 번째 일반 문단", page_number=1, chunk_id="a", embedding=embedding(0.9, 1)),
+        TextChunk(content="두 번째 일반 문단", page_number=1, chunk_id="b", embedding=embedding(0.85, 2)),
+        TextChunk(content="교차로 분석 시스템 설정 데이터 백업 지도 마커", page_number=2, chunk_id="c",
+                  embedding=embedding(0.7, 3)),
+    ])
+    query = embedding(1.0, 1)
+
+    assert [chunk.chunk_id for chunk, _ in store.search(query, top_k=3)][0] == "c"
+
+    batch = store.search_batch(np.stack([query, query]), top_k=[1, 3])
+
+    assert _summary(batch[0]) == _summary(store.search(query, top_k=1))
+    assert [chunk.chunk_id for chunk, _ in batch[0]] == ["a"]
+    assert _summary(batch[1]) == _summary(store.search(query, top_k=3))
+
+def test_search_batch_empty_store():
+    empty = FAISSVectorStore(embedding_dimension=DIM)
+
+    assert empty.search_batch(np.ones((3, DIM), dtype=np.float32), top_k=[1, 2, 3]) == [[], [], []]